@@ -0,0 +1,39 @@
+"""
+Runs the offline micro-benchmarks and saves their results as JSON.
+
+Usage: python -m benchmarks [--output benchmarks/results/micro-<revision>.json]
+"""
+# stdlib
+import argparse
+import importlib
+
+# project
+from benchmarks.common import git_revision, save_results, start_section, use_local_environment
+
+MODULES = (
+    "bench_init_data",
+    "bench_auth_middleware",
+    "bench_prometheus_middleware",
+    "bench_response_wrappers",
+    "bench_startup",
+    "bench_tracing",
+    "bench_logging",
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    use_local_environment()
+
+    for name in MODULES:
+        start_section(name)
+        importlib.import_module(f"benchmarks.{name}").main()
+
+    save_results(args.output or f"benchmarks/results/micro-{git_revision()}.json", suite="micro")
+
+
+if __name__ == "__main__":
+    main()
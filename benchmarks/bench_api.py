@@ -0,0 +1,258 @@
+"""
+Load test of the players API: ``main.app`` runs in-process and each endpoint is driven at a fixed concurrency.
+
+Stand-ins: Redis is an in-memory fakeredis server, spans go to a no-op exporter, and the database is a
+disposable PostgreSQL database (the player queries rely on ``unnest``, ``ANY`` and ``similarity``, which
+SQLite cannot run). The ``players`` table in it is dropped and re-seeded.
+
+Usage: BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_api
+    [--players 100000] [--requests 2000] [--concurrency 32] [--output benchmarks/results/api-<revision>.json]
+"""
+
+# stdlib
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from typing import Callable, List, NamedTuple, Tuple
+
+# thirdparty
+import httpx
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# project
+from benchmarks.common import (
+    BOT_TOKEN,
+    build_init_data,
+    git_revision,
+    percentiles,
+    print_row,
+    save_results,
+    start_section,
+    use_local_environment,
+)
+
+SEED = """
+    INSERT INTO players (id, username, score)
+    SELECT i, 'user_' || substr(md5(i::text), 1, 12), (i * 7919) % 1000003 FROM generate_series(1, :players) AS i
+"""
+# the indexes of the username search migration
+INDEXES = ('CREATE INDEX ix_players_username_prefix ON players ((lower(username) COLLATE "C"), id)',)
+TRIGRAM_INDEXES = ("CREATE INDEX ix_players_username_trgm ON players USING gin (lower(username) gin_trgm_ops)",)
+
+
+class NoOpSpanExporter(SpanExporter):
+    """Keeps the tracing pipeline in the measured path without a collector."""
+
+    def export(self, spans) -> SpanExportResult:
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+class Scenario(NamedTuple):
+    name: str
+    # request index -> (method, url, httpx request kwargs)
+    build: Callable[[int], Tuple[str, str, dict]]
+    expected_status: int = 200
+
+
+def use_fake_redis() -> None:
+    # fakeredis is only needed here, so it is not imported at module level
+    # thirdparty
+    from fakeredis import FakeServer
+    from fakeredis.aioredis import FakeConnection
+
+    # project
+    from db import db_setup
+
+    server = FakeServer()
+    pool = db_setup.redis_connection_pool
+    pool.connection_class = FakeConnection
+    pool.connection_kwargs["server"] = server
+
+
+async def seed(players: int, trigram: bool) -> None:
+    # project
+    from db.db_setup import Base, database
+
+    async with database.engine.begin() as connection:
+        if trigram:
+            await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(text(SEED), {"players": players})
+        for index in INDEXES + (TRIGRAM_INDEXES if trigram else ()):
+            await connection.execute(text(index))
+        await connection.execute(text("ANALYZE players"))
+
+
+async def has_trigram(database_url: str) -> bool:
+    engine = create_async_engine(database_url)
+    try:
+        async with engine.connect() as connection:
+            available = await connection.scalar(
+                text("SELECT count(*) FROM pg_available_extensions WHERE name = 'pg_trgm'")
+            )
+            return bool(available)
+    finally:
+        await engine.dispose()
+
+
+def build_scenarios(players: int, count: int, trigram: bool) -> List[Scenario]:
+    """Scenarios whose requests ``0..count-1`` are distinct, so new players are really new."""
+    rng = random.Random(42)
+    prefixes = ["user_" + format(rng.randrange(16), "x") for _ in range(count)]
+    existing = [rng.randint(1, players) for _ in range(count)]
+    batches = [",".join(str(rng.randint(1, players)) for _ in range(10)) for _ in range(count)]
+
+    # signed up front, so HMAC signing stays out of the measured requests
+    returning = [build_init_data(BOT_TOKEN, user_id, f"user_{user_id}") for user_id in existing]
+    new = [build_init_data(BOT_TOKEN, players + i + 1, f"bench_{players + i + 1}") for i in range(count)]
+
+    scenarios = [
+        Scenario("GET /players/{id}", lambda i: ("GET", f"/api/v1/players/{existing[i]}", {})),
+        Scenario("GET /players/{ids} x10", lambda i: ("GET", f"/api/v1/players/{batches[i]}", {})),
+        # "*" matches any current ETag, so every request takes the 304 path
+        Scenario(
+            "GET /players/{ids} x10 revalidated",
+            lambda i: ("GET", f"/api/v1/players/{batches[i]}", {"headers": {"If-None-Match": "*"}}),
+            expected_status=304,
+        ),
+        Scenario(
+            "GET /players/username prefix",
+            lambda i: ("GET", f"/api/v1/players/username/{prefixes[i]}", {"params": {"mode": "prefix"}}),
+        ),
+        Scenario(
+            "POST /players/lookup x1000",
+            lambda i: (
+                "POST",
+                "/api/v1/players/lookup",
+                {
+                    "json": {
+                        "initData": returning[i],
+                        "player_ids": random.Random(i).sample(range(1, players + 1), 1000),
+                    }
+                },
+            ),
+        ),
+        Scenario("GET /leaderboard top 20", lambda i: ("GET", "/api/v1/leaderboard", {"params": {"limit": 20}})),
+        Scenario("GET /leaderboard/{id}", lambda i: ("GET", f"/api/v1/leaderboard/{existing[i]}", {})),
+        Scenario("POST /players existing", lambda i: ("POST", "/api/v1/players", {"json": {"initData": returning[i]}})),
+        Scenario("POST /players new", lambda i: ("POST", "/api/v1/players", {"json": {"initData": new[i]}})),
+    ]
+    if trigram:
+        scenarios.insert(
+            4,
+            Scenario(
+                "GET /players/username substring",
+                lambda i: ("GET", f"/api/v1/players/username/{prefixes[i][-3:]}", {"params": {"mode": "substring"}}),
+            ),
+        )
+    return scenarios
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, indices: range, concurrency: int
+) -> Tuple[float, List[float], int]:
+    """Sends requests ``indices`` from ``concurrency`` workers; returns req/s, latencies in ms and error count."""
+    pending = iter(indices)
+    latencies = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in pending:
+            method, url, kwargs = scenario.build(i)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != scenario.expected_status:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return len(indices) / elapsed, latencies, errors
+
+
+async def run(args: argparse.Namespace, trigram: bool) -> None:
+    # project
+    import settings
+
+    # installed before the lifespan, which then keeps this provider
+    settings.setting_otlp("mini-app-api", settings.OTLP_GRPC_ENDPOINT, span_exporter=NoOpSpanExporter())
+    use_fake_redis()
+    # one log line per request would dominate the measurement
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    # project
+    from main import app
+    from services.leaderboard_service import leaderboard_service
+
+    warmup = args.concurrency * 4
+    scenarios = build_scenarios(args.players, warmup + args.requests, trigram)
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        # the engines exist once the lifespan has started
+        await seed(args.players, trigram)
+        await leaderboard_service.rebuild()
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            for scenario in scenarios:
+                start_section(scenario.name)
+                # the first requests open connections and fill the caches
+                await run_scenario(client, scenario, range(warmup), args.concurrency)
+                throughput, latencies, errors = await run_scenario(
+                    client, scenario, range(warmup, warmup + args.requests), args.concurrency
+                )
+
+                p50, p95, p99 = percentiles(latencies)
+                print_row("throughput", throughput, "req/s")
+                print_row("p50", p50, "ms")
+                print_row("p95", p95, "ms")
+                print_row("p99", p99, "ms")
+                print_row("unexpected status", errors, "requests")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if not database_url:
+        sys.exit("BENCH_DATABASE_URL must point to a disposable PostgreSQL database")
+
+    use_local_environment(database_url)
+    os.environ["BOT_TOKEN"] = BOT_TOKEN
+    # every request comes from the same client, which the per-IP limit would reject
+    os.environ["RATE_LIMIT_ENABLED"] = "False"
+    # the app is only instrumented with an endpoint; spans still go to the no-op exporter
+    os.environ.setdefault("OTLP_GRPC_ENDPOINT", "http://localhost:4317")
+    # fake Redis rewrites the whole bitmap on every bit set, and the filter would be built before the seed
+    os.environ.setdefault("PLAYER_FILTER_ENABLED", "False")
+
+    trigram = asyncio.run(has_trigram(database_url))
+    asyncio.run(run(args, trigram))
+
+    save_results(
+        args.output or f"benchmarks/results/api-{git_revision()}.json",
+        suite="api",
+        parameters=vars(args),
+    )
+
+
+if __name__ == "__main__":
+    main()
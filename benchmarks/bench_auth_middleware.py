@@ -0,0 +1,62 @@
+"""
+Per-request overhead of InitDataAuthMiddleware: body verification on writes, the optional header on reads.
+
+Usage: python -m benchmarks.bench_auth_middleware
+"""
+# stdlib
+import asyncio
+import json
+
+# thirdparty
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+# project
+from benchmarks.common import BOT_TOKEN, build_init_data, drive_asgi, print_row, use_local_environment
+
+REQUESTS_PER_RUN = 5000
+
+
+async def endpoint(request: Request) -> PlainTextResponse:
+    await request.body()
+    return PlainTextResponse("ok")
+
+
+def build_app(middleware=None) -> Starlette:
+    app = Starlette(routes=[Route("/players", endpoint, methods=["GET", "POST"])])
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+
+def main() -> None:
+    use_local_environment()
+
+    # project
+    import settings
+    from utils.auth import InitDataAuthMiddleware
+
+    init_data = build_init_data(settings.BOT_TOKEN or BOT_TOKEN)
+    body = json.dumps({"initData": init_data}).encode()
+    authorization = [(b"authorization", f"tma {init_data}".encode())]
+
+    baseline_app, app = build_app(), build_app(InitDataAuthMiddleware)
+
+    runs = (
+        ("POST: no middleware", baseline_app, "POST", body, []),
+        ("POST: initData body", app, "POST", body, []),
+        ("GET: no middleware", baseline_app, "GET", b"", []),
+        ("GET: anonymous", app, "GET", b"", []),
+        ("GET: tma authorization header", app, "GET", b"", authorization),
+    )
+    for name, target, method, request_body, headers in runs:
+        elapsed = asyncio.run(
+            drive_asgi(target, "/players", REQUESTS_PER_RUN, method=method, body=request_body, headers=headers)
+        )
+        print_row(name, elapsed, "us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Bulk player import throughput: ``import_players`` (COPY into a staging table, merged with ``INSERT ... ON CONFLICT``)
+vs. the multi-row ``unnest`` insert of ``upsert_players``, in batches of ``PLAYER_WRITER_MAX_BATCH_SIZE``.
+
+Both load the same generated CSV into ``players``, ids from ``FIRST_ID`` on, and the rows are deleted afterwards;
+the second pass of each method only finds existing players.
+
+Usage: BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_import [--rows 200000]
+"""
+# stdlib
+import argparse
+import asyncio
+import csv
+import os
+import tempfile
+import time
+
+# project
+from benchmarks.common import print_row, use_local_environment
+
+FIRST_ID = 1_000_000_000
+UNNEST_INSERT = """
+    INSERT INTO players (id, username)
+    SELECT * FROM unnest(CAST(:ids AS integer[]), CAST(:usernames AS varchar[]))
+    ON CONFLICT DO NOTHING
+"""
+
+
+async def unnest_import(path: str) -> None:
+    # thirdparty
+    from sqlalchemy import text
+
+    # project
+    import settings
+    from db.db_setup import database
+
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    for start in range(0, len(rows), settings.PLAYER_WRITER_MAX_BATCH_SIZE):
+        batch = rows[start : start + settings.PLAYER_WRITER_MAX_BATCH_SIZE]
+        async with database.engine.begin() as connection:
+            await connection.execute(
+                text(UNNEST_INSERT),
+                {"ids": [int(row["id"]) for row in batch], "usernames": [row["username"] for row in batch]},
+            )
+
+
+async def copy_import(path: str) -> None:
+    # project
+    from services.player_import_service import ImportFormat, import_players
+
+    await import_players(path, ImportFormat.CSV, checkpoint_path=f"{path}.checkpoint", restart=True)
+
+
+async def main(rows: int) -> None:
+    # thirdparty
+    from sqlalchemy import text
+
+    # project
+    from db.db_setup import database
+
+    database.start()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "players.csv")
+        with open(path, "w") as f:
+            f.write("id,username\n")
+            f.writelines(f"{FIRST_ID + i},import_{i}\n" for i in range(rows))
+
+        try:
+            for name, load in (("unnest INSERT", unnest_import), ("COPY + merge", copy_import)):
+                for label in ("new", "existing"):
+                    started = time.perf_counter()
+                    await load(path)
+                    print_row(f"{name}, {label} players", rows / (time.perf_counter() - started), "rows/s")
+
+                async with database.engine.begin() as connection:
+                    await connection.execute(text("DELETE FROM players WHERE id >= :id"), {"id": FIRST_ID})
+        finally:
+            await database.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    use_local_environment(os.environ["BENCH_DATABASE_URL"])
+    asyncio.run(main(parser.parse_args().rows))
@@ -0,0 +1,49 @@
+"""
+Cold vs warm initData verification.
+
+Usage: python -m benchmarks.bench_init_data
+"""
+# stdlib
+import hashlib
+import hmac
+import json
+from urllib.parse import unquote
+
+# project
+from benchmarks.common import BOT_TOKEN, build_init_data, print_row, time_per_call
+from utils.init_data import InitDataVerifier
+
+
+def legacy_validate_mini_app_data(data: str):
+    """The per-request implementation previously in ``utils.helpers``."""
+    vals = {k: unquote(v) for k, v in [s.split("=", 1) for s in data.split("&")]}
+    data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(vals.items()) if k != "hash")
+
+    secret_key = hmac.new("WebAppData".encode(), BOT_TOKEN.encode(), hashlib.sha256).digest()
+    h = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256)
+    return h.hexdigest() == vals["hash"], vals
+
+
+def main() -> None:
+    init_data = build_init_data(BOT_TOKEN)
+    verifier = InitDataVerifier(bot_token=BOT_TOKEN)
+    assert verifier.verify(init_data) is not None
+
+    def cold():
+        verifier.cache.clear()
+        verifier.verify(init_data)
+
+    def warm():
+        verifier.verify(init_data)
+
+    def legacy():
+        is_valid, data = legacy_validate_mini_app_data(init_data)
+        json.loads(data["user"])
+
+    print_row("legacy validate_mini_app_data + json.loads", time_per_call(legacy))
+    print_row("InitDataVerifier.verify (cold)", time_per_call(cold))
+    print_row("InitDataVerifier.verify (warm)", time_per_call(warm))
+
+
+if __name__ == "__main__":
+    main()
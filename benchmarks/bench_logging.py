@@ -0,0 +1,129 @@
+"""
+Event-loop time spent in logging calls, legacy pipeline vs ``utils.log``, while the loop serves concurrent tasks.
+
+Legacy: the two ``uvicorn.access`` filters that formatted every message, and a text handler writing on the loop.
+Current: ``AccessLogFilter`` and a ``LogQueueHandler`` whose records a listener thread formats as JSON and
+writes. Both write to a temporary file. Only the time inside the logging calls on the loop is counted; each
+request logs one access record, 200 (filtered out) or 404, and every tenth one an application record.
+
+Usage: python -m benchmarks.bench_logging
+"""
+
+# stdlib
+import asyncio
+import logging
+import tempfile
+import time
+import traceback
+from typing import Callable
+
+# project
+from benchmarks.common import print_row, use_local_environment
+
+TASKS = 50
+REQUESTS_PER_TASK = 400
+LEGACY_FORMAT = "%(asctime)s %(levelname)s [%(name)s] [%(filename)s:%(lineno)d] - %(message)s"
+# the pipeline turns off record fields it does not write
+SRCFILE = logging._srcfile
+
+
+class LegacyEndpointFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.getMessage().find("GET /metrics") == -1
+
+
+class LegacyNon200Filter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not record.getMessage().endswith("200")
+
+
+def log_error_legacy(logger: logging.Logger, exc: Exception) -> None:
+    logger.error(f"Error: {exc}\n{traceback.format_exc()}")
+    # the handler formatted it again for the response
+    traceback.format_exc()
+
+
+def log_error(logger: logging.Logger, exc: Exception) -> None:
+    logger.error(f"Error: {exc}", exc_info=exc)
+
+
+def configure_legacy(stream) -> Callable[[], None]:
+    logging.logThreads = logging.logProcesses = logging.logMultiprocessing = True
+    logging._srcfile = SRCFILE
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(LEGACY_FORMAT))
+    access = logging.getLogger("uvicorn.access")
+    access.filters = [LegacyEndpointFilter(), LegacyNon200Filter()]
+    access.propagate = False
+    for name in ("", "uvicorn.access"):
+        logging.getLogger(name).handlers = [handler]
+    return lambda: None
+
+
+def configure_current(stream) -> Callable[[], None]:
+    # project
+    from utils.log import AccessLogFilter, log_pipeline
+
+    access = logging.getLogger("uvicorn.access")
+    access.filters = [AccessLogFilter()]
+    access.propagate = False
+    for name in ("", "uvicorn.access"):
+        logging.getLogger(name).handlers = [logging.StreamHandler(stream)]
+    log_pipeline.start()
+    return log_pipeline.stop
+
+
+async def serve(error: Callable[[logging.Logger, Exception], None], error_every: int) -> float:
+    access = logging.getLogger("uvicorn.access")
+    app = logging.getLogger("services.bench")
+    spent = 0.0
+    records = 0
+
+    async def task(task_id: int) -> None:
+        nonlocal spent, records
+        for i in range(REQUESTS_PER_TASK):
+            # the rest of the request
+            await asyncio.sleep(0)
+            started = time.perf_counter()
+            status = 404 if i % 5 == 0 else 200
+            access.info(
+                '%s - "%s %s HTTP/%s" %d', f"10.0.0.{task_id}:5123", "GET", f"/api/v1/players/{i}", "1.1", status
+            )
+            if i % 10 == 0:
+                app.info("Player %s loaded in %.1f ms", i, 1.5)
+            if error_every and i % error_every == 0:
+                try:
+                    raise ValueError(f"player {i}")
+                except ValueError as exc:
+                    error(app, exc)
+            spent += time.perf_counter() - started
+            records += 1
+
+    await asyncio.gather(*(task(task_id) for task_id in range(TASKS)))
+    return spent / records * 1_000_000
+
+
+def run(configure: Callable, error: Callable, error_every: int) -> float:
+    logging.getLogger().setLevel(logging.INFO)
+    with tempfile.TemporaryFile("w") as stream:
+        stop = configure(stream)
+        try:
+            return asyncio.run(serve(error, error_every))
+        finally:
+            stop()
+            # the handlers write to the file about to be closed
+            for name in ("", "uvicorn.access"):
+                logging.getLogger(name).handlers = []
+
+
+def main() -> None:
+    use_local_environment()
+
+    pipelines = (("legacy", configure_legacy, log_error_legacy), ("queue + JSON", configure_current, log_error))
+    for label, error_every in (("", 0), (", 1% errors", 100)):
+        for name, configure, error in pipelines:
+            print_row(f"{name}{label}: loop time in logging", run(configure, error, error_every), "us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Per-request overhead of the Prometheus middleware, legacy vs pure ASGI, by number of routes.
+
+Usage: python -m benchmarks.bench_prometheus_middleware
+"""
+# stdlib
+import asyncio
+import time
+from typing import Tuple
+
+# thirdparty
+from fastapi import FastAPI
+from opentelemetry import trace
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Match
+from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
+from starlette.types import ASGIApp
+
+# project
+from benchmarks.common import drive_asgi, print_row
+from settings import (
+    EXCEPTIONS,
+    REQUESTS,
+    REQUESTS_IN_PROGRESS,
+    REQUESTS_PROCESSING_TIME,
+    RESPONSES,
+    PrometheusMiddleware,
+)
+
+ROUTE_COUNTS = (10, 100, 1000)
+REQUESTS_PER_RUN = 5000
+
+
+class LegacyPrometheusMiddleware(BaseHTTPMiddleware):
+    """The ``BaseHTTPMiddleware`` implementation previously in ``settings``."""
+
+    def __init__(self, app: ASGIApp, app_name: str = "mini-app-api-legacy") -> None:
+        super().__init__(app)
+        self.app_name = app_name
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        method = request.method
+        path, is_handled_path = self.get_path(request)
+
+        if not is_handled_path:
+            return await call_next(request)
+
+        REQUESTS_IN_PROGRESS.labels(method=method, path=path, app_name=self.app_name).inc()
+        REQUESTS.labels(method=method, path=path, app_name=self.app_name).inc()
+        before_time = time.perf_counter()
+        try:
+            response = await call_next(request)
+        except BaseException as e:
+            status_code = HTTP_500_INTERNAL_SERVER_ERROR
+            EXCEPTIONS.labels(method=method, path=path, exception_type=type(e).__name__, app_name=self.app_name).inc()
+            raise e from None
+        else:
+            status_code = response.status_code
+            after_time = time.perf_counter()
+            span = trace.get_current_span()
+            trace_id = trace.format_trace_id(span.get_span_context().trace_id)
+
+            REQUESTS_PROCESSING_TIME.labels(method=method, path=path, app_name=self.app_name).observe(
+                after_time - before_time, exemplar={"TraceID": trace_id}
+            )
+        finally:
+            RESPONSES.labels(method=method, path=path, status_code=status_code, app_name=self.app_name).inc()
+            REQUESTS_IN_PROGRESS.labels(method=method, path=path, app_name=self.app_name).dec()
+
+        return response
+
+    @staticmethod
+    def get_path(request: Request) -> Tuple[str, bool]:
+        for route in request.app.routes:
+            match, _ = route.matches(request.scope)
+            if match == Match.FULL:
+                return route.path, True
+
+        return request.url.path, False
+
+
+def build_app(route_count: int, middleware=None) -> FastAPI:
+    app = FastAPI()
+
+    async def endpoint(item_id: int):
+        return PlainTextResponse("ok")
+
+    for i in range(route_count):
+        app.add_api_route(f"/resource{i}/{{item_id}}", endpoint, methods=["GET"])
+
+    if middleware is not None:
+        app.add_middleware(middleware, app_name=f"bench-{middleware.__name__}-{route_count}")
+
+    return app
+
+
+def main() -> None:
+    for route_count in ROUTE_COUNTS:
+        # the last registered route is the worst case for a linear scan
+        path = f"/resource{route_count - 1}/42"
+        baseline = asyncio.run(drive_asgi(build_app(route_count), path, REQUESTS_PER_RUN))
+        legacy = asyncio.run(drive_asgi(build_app(route_count, LegacyPrometheusMiddleware), path, REQUESTS_PER_RUN))
+        current = asyncio.run(drive_asgi(build_app(route_count, PrometheusMiddleware), path, REQUESTS_PER_RUN))
+
+        print_row(f"{route_count} routes: no middleware", baseline, "us/request")
+        print_row(f"{route_count} routes: legacy middleware", legacy, "us/request")
+        print_row(f"{route_count} routes: ASGI middleware", current, "us/request")
+
+
+if __name__ == "__main__":
+    main()
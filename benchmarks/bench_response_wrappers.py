@@ -0,0 +1,71 @@
+"""
+Response envelope encoding, legacy pydantic + jsonable_encoder + JSONResponse vs. the orjson wrappers.
+
+Usage: python -m benchmarks.bench_response_wrappers
+"""
+# stdlib
+from datetime import datetime
+
+# thirdparty
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# project
+from benchmarks.common import print_row, time_per_call
+from db.models.player_model import PlayerModel
+from db.schemas.player_schema import PlayerSchema
+from utils.helpers import response_wrapper_results
+from utils.pagination import get_pagination
+
+ROW_COUNTS = (1, 20, 1000)
+
+
+def legacy_response_wrapper_results(results, status_code=200, pagination=None):
+    response = {"results": jsonable_encoder(results)}
+    if pagination:
+        response["pagination"] = pagination
+    return JSONResponse(content=response, status_code=status_code)
+
+
+def build_rows(count: int) -> list:
+    now = datetime.now()
+    return [PlayerModel(id=i, username=f"player_{i}", created_at=now, updated_at=None) for i in range(count)]
+
+
+def main() -> None:
+    for count in ROW_COUNTS:
+        rows = build_rows(count)
+        cached_rows = [PlayerSchema.model_validate(row, from_attributes=True).model_dump(mode="json") for row in rows]
+        pagination = get_pagination(page=1, limit=count, count=count)
+        number = max(10, 20000 // count)
+
+        legacy = legacy_response_wrapper_results(
+            results=[PlayerSchema(**row.__dict__) for row in rows], pagination=pagination
+        )
+        current = response_wrapper_results(results=rows, pagination=pagination, schema=PlayerSchema)
+        assert legacy.body == current.body
+
+        print_row(
+            f"{count} ORM rows: legacy",
+            time_per_call(
+                lambda: legacy_response_wrapper_results(
+                    results=[PlayerSchema(**row.__dict__) for row in rows], pagination=pagination
+                ),
+                number=number,
+            ),
+        )
+        print_row(
+            f"{count} ORM rows: orjson",
+            time_per_call(
+                lambda: response_wrapper_results(results=rows, pagination=pagination, schema=PlayerSchema),
+                number=number,
+            ),
+        )
+        print_row(
+            f"{count} cached dict rows: orjson",
+            time_per_call(lambda: response_wrapper_results(results=cached_rows, pagination=pagination), number=number),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Requests served by a small pool: a transaction held for the whole request (the previous ``get_session``) vs.
+an autocommit ``ReadSession`` that returns the connection after each statement.
+
+Each simulated request runs one query and then spends ``--work-ms`` on non-database work (cache writes,
+serialization), during which the legacy session still holds its connection.
+
+Usage: BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_sessions
+    [--pool-size 4] [--concurrency 64] [--requests 2000] [--work-ms 2]
+"""
+# stdlib
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# thirdparty
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+# project
+from benchmarks.common import percentiles, print_row, use_local_environment
+
+QUERY = text("SELECT CAST(:value AS integer) AS value, pg_sleep(0.0005)")
+
+
+async def legacy_request(session_factory, work: float) -> None:
+    async with session_factory.begin() as session:
+        await session.execute(QUERY, {"value": 1})
+        await asyncio.sleep(work)
+        await session.commit()
+
+
+async def read_request(session_factory, work: float) -> None:
+    async with session_factory() as session:
+        await session.execute(QUERY, {"value": 1})
+        await asyncio.sleep(work)
+
+
+async def measure(name: str, request, session_factory, args: argparse.Namespace) -> None:
+    pending = iter(range(args.requests))
+    latencies = []
+    work = args.work_ms / 1000
+
+    async def worker() -> None:
+        for _ in pending:
+            started = time.perf_counter()
+            await request(session_factory, work)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    p50, p95, p99 = percentiles(latencies)
+    print_row(f"{name}: throughput", args.requests / elapsed, "req/s")
+    print_row(f"{name}: p50", p50, "ms")
+    print_row(f"{name}: p99", p99, "ms")
+
+
+async def run(database_url: str, args: argparse.Namespace) -> None:
+    # project
+    from db.db_setup import ReadSession
+
+    engine = create_async_engine(database_url, pool_size=args.pool_size, max_overflow=0)
+    legacy_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    read_factory = sessionmaker(
+        bind=engine.execution_options(isolation_level="AUTOCOMMIT"), class_=ReadSession, expire_on_commit=False
+    )
+
+    try:
+        # open the pool's connections before measuring
+        await measure("warm-up", read_request, read_factory, args)
+        await measure("transaction per request", legacy_request, legacy_factory, args)
+        await measure("autocommit ReadSession", read_request, read_factory, args)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--work-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if not database_url:
+        sys.exit("BENCH_DATABASE_URL must point to a PostgreSQL database")
+
+    use_local_environment(database_url)
+    asyncio.run(run(database_url, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Cold start: importing ``db.db_setup`` (what scripts and migrations pay) and ``main``, building an app with
+``create_app()``, running its lifespan startup and serving the first request.
+
+Every run is a fresh interpreter, so nothing is cached between runs; medians are reported. The first request
+is ``/health/ready``, which needs neither PostgreSQL nor Redis.
+
+Usage: python -m benchmarks.bench_startup
+"""
+# stdlib
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+# project
+from benchmarks.common import print_row, use_local_environment
+
+RUNS = 5
+
+
+def measure_db() -> Dict[str, float]:
+    started = time.perf_counter()
+    # project
+    import db.db_setup  # noqa: F401
+
+    return {"import db.db_setup": (time.perf_counter() - started) * 1000}
+
+
+def measure_app() -> Dict[str, float]:
+    timings = {}
+
+    started = time.perf_counter()
+    # project
+    import main
+
+    timings["import main"] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    app = main.create_app()
+    timings["create_app()"] = (time.perf_counter() - started) * 1000
+
+    async def first_request() -> None:
+        # thirdparty
+        import httpx
+
+        started = time.perf_counter()
+        # the lifespan is left without shutdown: the process exits right after
+        await app.router.lifespan_context(app).__aenter__()
+        timings["lifespan startup"] = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver") as client:
+            response = await client.get("/health/ready")
+        response.raise_for_status()
+        timings["first request"] = (time.perf_counter() - started) * 1000
+
+    asyncio.run(first_request())
+    return timings
+
+
+def run_child(target: str) -> Dict[str, float]:
+    """Runs ``measure_<target>`` in a fresh interpreter; the wall time covers interpreter startup as well."""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child", target],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    timings["process start to exit"] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def main() -> None:
+    use_local_environment()
+
+    for target in ("db", "app"):
+        runs: List[Dict[str, float]] = [run_child(target) for _ in range(RUNS)]
+        for name in runs[0]:
+            print_row(f"{target}: {name}", statistics.median(run[name] for run in runs), "ms")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        timings = {"db": measure_db, "app": measure_app}[sys.argv[2]]()
+        print(json.dumps(timings), flush=True)
+        # skips the interpreter shutdown and the background tasks and threads the app started
+        os._exit(0)
+    main()
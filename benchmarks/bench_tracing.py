@@ -0,0 +1,81 @@
+"""
+Throughput of ``/health/ready`` on the app built by ``create_app()`` with tracing off, sampled and at 100%.
+
+The tracer provider can only be installed once per process, so every mode runs in a fresh interpreter; spans go
+to a no-op exporter. Each request records a server span and its ``http send`` spans when sampled.
+
+Usage: python -m benchmarks.bench_tracing
+"""
+# stdlib
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict
+
+# project
+from benchmarks.common import drive_asgi, print_row, use_local_environment
+
+RUNS = 3
+REQUESTS_PER_RUN = 5000
+
+MODES: Dict[str, Dict[str, str]] = {
+    "off": {"OTLP_GRPC_ENDPOINT": ""},
+    "sampled 10%": {"TRACING_SAMPLE_RATIO": "0.1"},
+    "sampled 10%, errors and slow not kept": {
+        "TRACING_SAMPLE_RATIO": "0.1",
+        "TRACING_KEEP_ERRORS": "False",
+        "TRACING_SLOW_THRESHOLD_MS": "0",
+    },
+    "100%": {"TRACING_SAMPLE_RATIO": "1.0"},
+}
+
+
+def measure() -> float:
+    """Microseconds per request in this process, configured by the environment."""
+    # project
+    import settings
+    from benchmarks.bench_api import NoOpSpanExporter
+
+    if settings.TRACING_ENABLED:
+        settings.setting_otlp("mini-app-api", settings.OTLP_GRPC_ENDPOINT, span_exporter=NoOpSpanExporter())
+
+    # project
+    import main
+    from db.db_setup import database
+
+    app = main.create_app()
+    # the readiness probe only reads the pool status, the engines never connect
+    database.start()
+    return asyncio.run(drive_asgi(app, "/health/ready", REQUESTS_PER_RUN))
+
+
+def run_child(mode: str) -> float:
+    env = {**os.environ, "OTLP_GRPC_ENDPOINT": "http://localhost:4317", **MODES[mode]}
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_tracing", "--child"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    use_local_environment()
+
+    for mode in MODES:
+        per_request = statistics.median(run_child(mode) for _ in range(RUNS))
+        print_row(f"tracing {mode}", 1_000_000 / per_request, "req/s")
+        print_row(f"tracing {mode}: per request", per_request, "us/request")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        print(json.dumps(measure()), flush=True)
+        # skips the interpreter shutdown and the export thread
+        os._exit(0)
+    main()
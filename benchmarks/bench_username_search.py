@@ -0,0 +1,113 @@
+"""
+Username search latency on a seeded table, legacy ILIKE + count vs. search_players, before and after the
+pg_trgm / prefix indexes.
+
+Requires a disposable PostgreSQL database with the pg_trgm extension available; everything is created in
+a separate ``bench_search`` schema which is dropped at the end.
+
+Usage: BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_username_search [--rows 3000000]
+"""
+# stdlib
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+# thirdparty
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+# project
+from benchmarks.common import print_row
+from db.models.player_model import PlayerModel
+from services.player_search_service import search_counts, search_players
+
+SCHEMA = "bench_search"
+TERMS = ("ab", "user_ab", "c4ca4")
+RUNS = 5
+
+SETUP = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE",
+    f"CREATE SCHEMA {SCHEMA}",
+    f"""
+    CREATE TABLE {SCHEMA}.players (
+        id INTEGER PRIMARY KEY,
+        username VARCHAR(32) NOT NULL UNIQUE,
+        created_at TIMESTAMP NOT NULL DEFAULT now(),
+        updated_at TIMESTAMP
+    )
+    """,
+)
+SEED = f"""
+    INSERT INTO {SCHEMA}.players (id, username)
+    SELECT i, 'user_' || substr(md5(i::text), 1, 12) FROM generate_series(1, :rows) AS i
+"""
+INDEXES = (
+    f"CREATE INDEX ix_players_username_trgm ON {SCHEMA}.players USING gin (lower(username) gin_trgm_ops)",
+    f'CREATE INDEX ix_players_username_prefix ON {SCHEMA}.players ((lower(username) COLLATE "C"), id)',
+    f"ANALYZE {SCHEMA}.players",
+)
+
+
+async def legacy_search(session: AsyncSession, username: str, page: int, limit: int):
+    username_filter = func.lower(PlayerModel.username).ilike("%" + username + "%")
+    result = await session.execute(select(PlayerModel).filter(username_filter).offset((page - 1) * limit).limit(limit))
+    count = await session.execute(select(func.count(PlayerModel.id)).filter(username_filter))
+    return result.scalars().all(), count.scalar()
+
+
+async def measure(session_factory, search, term: str) -> float:
+    timings = []
+    for _ in range(RUNS):
+        async with session_factory() as session:
+            started = time.perf_counter()
+            await search(session, term, 1, 20)
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def uncached_search(session: AsyncSession, username: str, page: int, limit: int):
+    # every run pays for the total, as the legacy query does
+    search_counts.clear()
+    return await search_players(session, username, page, limit)
+
+
+async def run_searches(session_factory, label: str) -> None:
+    for term in TERMS:
+        print_row(f"{label} legacy ILIKE + count '{term}'", await measure(session_factory, legacy_search, term), "ms")
+        print_row(f"{label} search_players '{term}'", await measure(session_factory, uncached_search, term), "ms")
+
+
+async def main(rows: int) -> None:
+    engine = create_async_engine(
+        os.environ["BENCH_DATABASE_URL"], connect_args={"server_settings": {"search_path": f"{SCHEMA},public"}}
+    )
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)  # noqa
+
+    async with engine.begin() as connection:
+        for statement in SETUP:
+            await connection.execute(text(statement))
+        await connection.execute(text(SEED), {"rows": rows})
+        await connection.execute(text(f"ANALYZE {SCHEMA}.players"))
+
+    try:
+        await run_searches(session_factory, "no indexes:")
+
+        async with engine.begin() as connection:
+            for statement in INDEXES:
+                await connection.execute(text(statement))
+
+        await run_searches(session_factory, "indexes:")
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    asyncio.run(main(parser.parse_args().rows))
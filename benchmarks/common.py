@@ -0,0 +1,155 @@
+# stdlib
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import statistics
+import subprocess
+import time
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+# thirdparty
+from starlette.types import ASGIApp
+
+BOT_TOKEN = "123456:benchmark-token"
+# engines connect lazily, so micro-benchmarks never reach this database
+PLACEHOLDER_DATABASE_URL = "postgresql+asyncpg://postgres@localhost/mini_app_db"
+
+# every row printed by a benchmark, in order; ``save_results`` writes them out for comparison between commits
+results: Dict[str, Dict[str, dict]] = {}
+section = "main"
+
+
+def use_local_environment(database_url: Optional[str] = None) -> None:
+    """Points ``settings`` at local stand-ins; must run before any project module is imported."""
+    os.environ.setdefault("BOT_TOKEN", BOT_TOKEN)
+    if database_url:
+        os.environ["DATABASE_URL"] = database_url
+        os.environ["DATABASE_URL_PSYCOPG2"] = database_url.replace("+asyncpg", "+psycopg2")
+        os.environ.pop("DATABASE_REPLICA_URL", None)
+    else:
+        os.environ.setdefault("DATABASE_URL", PLACEHOLDER_DATABASE_URL)
+        os.environ.setdefault("DATABASE_URL_PSYCOPG2", os.environ["DATABASE_URL"].replace("+asyncpg", "+psycopg2"))
+
+
+def build_init_data(bot_token: str, user_id: int = 456158277, username: str = "john_doe") -> str:
+    user = {
+        "id": user_id,
+        "first_name": "John Doe",
+        "last_name": "",
+        "username": username,
+        "language_code": "en",
+        "is_premium": True,
+        "allows_write_to_pm": True,
+    }
+    vals = {
+        "query_id": "AAHdF6IQAAAAAN0XohDhrOrc",
+        "user": json.dumps(user, separators=(",", ":")),
+        "chat_instance": "-8317356420498457231",
+        "chat_type": "private",
+        "auth_date": str(int(time.time())),
+    }
+    data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(vals.items()))
+    secret_key = hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+    vals["hash"] = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return "&".join(f"{k}={quote(v, safe='')}" for k, v in vals.items())
+
+
+def time_per_call(func: Callable[[], object], number: int = 10000, repeat: int = 5) -> float:
+    """Best-of-``repeat`` time of a single ``func()`` call, in microseconds."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1_000_000
+
+
+def start_section(name: str) -> None:
+    global section
+    section = name
+    print(f"\n# {name}")
+
+
+def print_row(name: str, value: float, unit: str = "us/call") -> None:
+    results.setdefault(section, {})[name] = {"value": round(value, 3), "unit": unit}
+    print(f"{name:<48} {value:>12.2f} {unit}")
+
+
+def percentiles(latencies: List[float]) -> Tuple[float, float, float]:
+    """p50, p95 and p99 of ``latencies``."""
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(path: str, **extra) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    document = {
+        "revision": git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        **extra,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"\nResults saved to {path}")
+
+
+async def drive_asgi(
+    app: ASGIApp,
+    path: str,
+    count: int,
+    method: str = "GET",
+    body: bytes = b"",
+    headers: Iterable[Tuple[bytes, bytes]] = (),
+) -> float:
+    """Calls ``app`` directly with ``count`` identical requests, without a server; microseconds per request."""
+    headers = list(headers)
+
+    def make_receive():
+        received = False
+
+        async def receive():
+            nonlocal received
+            if received:
+                # like a server, only report a disconnect once the response is done
+                await asyncio.Event().wait()
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        return receive
+
+    async def send(message):
+        pass
+
+    def scope():
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": headers,
+            "client": ("127.0.0.1", 12345),
+            "server": ("testserver", 80),
+        }
+
+    for _ in range(100):
+        await app(scope(), make_receive(), send)
+
+    started = time.perf_counter()
+    for _ in range(count):
+        await app(scope(), make_receive(), send)
+    return (time.perf_counter() - started) / count * 1_000_000
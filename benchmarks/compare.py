@@ -0,0 +1,35 @@
+"""
+Compares two result files written by the benchmarks, row by row.
+
+Usage: python -m benchmarks.compare benchmarks/results/micro-<old>.json benchmarks/results/micro-<new>.json
+"""
+# stdlib
+import argparse
+import json
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"{baseline['revision']} -> {candidate['revision']}")
+    for section, rows in candidate["results"].items():
+        print(f"\n# {section}")
+        for name, row in rows.items():
+            before = baseline["results"].get(section, {}).get(name)
+            if before is None or not before["value"]:
+                print(f"{name:<48} {'':>12} {row['value']:>12.2f} {row['unit']}")
+                continue
+            change = (row["value"] - before["value"]) / before["value"] * 100
+            print(f"{name:<48} {before['value']:>12.2f} {row['value']:>12.2f} {row['unit']:<12} {change:+7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
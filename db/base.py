@@ -0,0 +1,5 @@
+# thirdparty
+from sqlalchemy.orm import declarative_base
+
+# kept apart from db_setup, so models and migrations can be imported without creating engines
+Base = declarative_base()
@@ -0,0 +1,22 @@
+# stdlib
+from typing import Any, Dict, Sequence, Tuple
+
+
+def values_list(columns: Dict[str, str], rows: Sequence[Sequence[Any]]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Builds ``VALUES (...), (...) AS v (<columns>)`` for ``UPDATE ... FROM`` with one bind parameter per value,
+    and the parameters. ``columns`` maps each column to its SQL type; the first row casts to it, and the
+    following rows take the same types.
+    """
+    names = list(columns)
+    params = {}
+    tuples = []
+    for i, row in enumerate(rows):
+        placeholders = []
+        for name, value in zip(names, row):
+            placeholder = f":{name}_{i}"
+            placeholders.append(f"CAST({placeholder} AS {columns[name]})" if i == 0 else placeholder)
+            params[f"{name}_{i}"] = value
+        tuples.append(f"({', '.join(placeholders)})")
+
+    return f"(VALUES {', '.join(tuples)}) AS v ({', '.join(names)})", params
@@ -1,29 +1,126 @@
 # stdlib
-from typing import AsyncGenerator
+from functools import lru_cache
+from typing import AsyncGenerator, Optional
 
 # thirdparty
 import redis
 from redis import asyncio as aioredis
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.ext.declarative import declarative_base
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import scoped_session, sessionmaker
+from starlette.requests import Request
 
 # project
 import settings
-from settings import DATABASE_URL, DATABASE_URL_PSYCOPG2
+from db.base import Base  # noqa: F401
+from db.instrumentation import InstrumentedAsyncPool, instrument_engine
+from settings import DATABASE_REPLICA_URL, DATABASE_URL, DATABASE_URL_PSYCOPG2, logger
+from utils.cache import TTLCache
 
-engine = create_engine(DATABASE_URL_PSYCOPG2)
 
-Base = declarative_base()
+class ReadSession(AsyncSession):
+    """
+    ``AsyncSession`` for reads on an autocommit engine.
 
-Session = sessionmaker(bind=engine)
-ScopedSession = scoped_session(Session)
+    Results are buffered, so the connection goes back to the pool right after each statement instead of
+    when the request ends; with autocommit there is no BEGIN/ROLLBACK round trip around it either.
+    """
 
-async_engine = create_async_engine(
-    DATABASE_URL, pool_size=settings.ASYNC_ENGINE_POOL_SIZE, max_overflow=settings.ASYNC_ENGINE_MAX_OVERFLOW
-)
-async_session = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)  # noqa
+    async def execute(self, *args, **kwargs):
+        try:
+            return await super().execute(*args, **kwargs)
+        finally:
+            await self.close()
+
+    async def scalar(self, *args, **kwargs):
+        try:
+            return await super().scalar(*args, **kwargs)
+        finally:
+            await self.close()
+
+
+# bound to the engines by Database.start()
+async_session = sessionmaker(class_=AsyncSession, expire_on_commit=False)
+async_read_session = sessionmaker(class_=ReadSession, expire_on_commit=False)
+async_primary_read_session = sessionmaker(class_=ReadSession, expire_on_commit=False)
+
+
+class Database:
+    """
+    Async engines of the primary and of the optional read replica.
+
+    The app lifespan calls ``start()`` and ``dispose()``, so importing this module opens nothing and every
+    worker creates its pools after the fork. Scripts using the session factories call them as well.
+    """
+
+    def __init__(self) -> None:
+        self.engine: Optional[AsyncEngine] = None
+        self.replica_engine: Optional[AsyncEngine] = None
+
+    @property
+    def has_replica(self) -> bool:
+        return self.replica_engine is not None and self.replica_engine is not self.engine
+
+    def start(self) -> None:
+        if self.engine is not None:
+            return
+
+        self.engine = create_async_engine(
+            DATABASE_URL,
+            pool_size=settings.ASYNC_ENGINE_POOL_SIZE,
+            max_overflow=settings.ASYNC_ENGINE_MAX_OVERFLOW,
+            poolclass=InstrumentedAsyncPool,
+            pool_logging_name="primary",
+        )
+        instrument_engine(self.engine, "primary")
+
+        # without a replica, reads go to the primary; either way they run outside explicit transactions
+        self.replica_engine = self.engine
+        if DATABASE_REPLICA_URL:
+            self.replica_engine = create_async_engine(
+                DATABASE_REPLICA_URL,
+                pool_size=settings.ASYNC_REPLICA_ENGINE_POOL_SIZE,
+                max_overflow=settings.ASYNC_REPLICA_ENGINE_MAX_OVERFLOW,
+                poolclass=InstrumentedAsyncPool,
+                pool_logging_name="replica",
+            )
+            instrument_engine(self.replica_engine, "replica")
+
+        async_session.configure(bind=self.engine)
+        async_read_session.configure(bind=self.replica_engine.execution_options(isolation_level="AUTOCOMMIT"))
+        async_primary_read_session.configure(bind=self.engine.execution_options(isolation_level="AUTOCOMMIT"))
+
+    async def dispose(self) -> None:
+        if self.engine is None:
+            return
+
+        if self.has_replica:
+            await self.replica_engine.dispose()
+        await self.engine.dispose()
+        self.engine = self.replica_engine = None
+
+
+database = Database()
+
+
+@lru_cache(maxsize=None)
+def _sync_session():
+    # psycopg2 is only imported by the code still using the sync engine
+    # thirdparty
+    from sqlalchemy import create_engine
+
+    return scoped_session(sessionmaker(bind=create_engine(DATABASE_URL_PSYCOPG2)))
+
+
+def __getattr__(name: str):
+    # the sync ``engine``, ``Session`` and ``ScopedSession`` are created on first access
+    if name == "ScopedSession":
+        return _sync_session()
+    if name == "Session":
+        return _sync_session().session_factory
+    if name == "engine":
+        return _sync_session().session_factory.kw["bind"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def create_redis():
@@ -35,16 +132,66 @@ def create_redis_sync():
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session.begin() as session:
+    """Read-write session; a connection is checked out on first use, and only then committed."""
+    async with async_session() as session:
         try:
             yield session
-            await session.commit()
         except Exception:
             await session.rollback()
             raise
-        finally:
-            await session.close()
+
+        if session.in_transaction():
+            await session.commit()
 
 
 redis_connection_pool = create_redis()
 redis_connection_pool_sync = create_redis_sync()
+
+redis_client = aioredis.Redis(connection_pool=redis_connection_pool)
+
+# pins set by this worker; pins set by other workers are found in Redis
+primary_pins = TTLCache(maxsize=10000, ttl=settings.READ_YOUR_WRITES_TTL)
+
+
+def _pin_key(player_id: int) -> str:
+    return f"db:pin:{player_id}"
+
+
+async def pin_to_primary(player_id: int) -> None:
+    """Routes the player's reads to the primary for ``READ_YOUR_WRITES_TTL`` seconds after a write."""
+    if settings.READ_YOUR_WRITES_TTL <= 0 or not database.has_replica:
+        return
+
+    primary_pins.set(player_id, True)
+    try:
+        await redis_client.set(_pin_key(player_id), 1, ex=settings.READ_YOUR_WRITES_TTL)
+    except RedisError as e:
+        logger.warning(f"Primary pin write failed: {e}")
+
+
+async def is_pinned_to_primary(player_id: int) -> bool:
+    if settings.READ_YOUR_WRITES_TTL <= 0 or not database.has_replica:
+        return False
+
+    if primary_pins.get(player_id):
+        return True
+
+    try:
+        return bool(await redis_client.exists(_pin_key(player_id)))
+    except RedisError as e:
+        logger.warning(f"Primary pin read failed: {e}")
+        return False
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Autocommit read session on the replica, or on the primary while the requesting player is pinned to it.
+
+    ``session.info["primary"]`` tells services whether reads may be served by replica-backed loaders.
+    """
+    player = request.scope.get("state", {}).get("player")
+    primary = player is not None and await is_pinned_to_primary(player.id)
+
+    async with (async_primary_read_session if primary else async_read_session)() as session:
+        session.info["primary"] = primary
+        yield session
@@ -0,0 +1,136 @@
+# stdlib
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict
+
+# thirdparty
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from prometheus_client import Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Histogram of time spent waiting for a pooled database connection (in seconds).",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Number of database connections in use by pool.", ["pool"], multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Number of overflow database connections open by pool.", ["pool"], multiprocess_mode="livesum"
+)
+DB_POOL_CAPACITY = Gauge(
+    "db_pool_capacity", "Maximum number of database connections by pool.", ["pool"], multiprocess_mode="livesum"
+)
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "Histogram of database statement execution time by pool and statement fingerprint (in seconds).",
+    ["pool", "statement"],
+)
+
+tracer = trace.get_tracer(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"\$\d+(?:::[\w\[\]]+(?:\(\d+\))?)?|%\(\w+\)s|:\w+\b")
+_VALUES_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+FINGERPRINT_MAX_LENGTH = 200
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    Normalizes a statement into a low-cardinality label: literals and bind parameters become ``?`` and
+    expanded ``IN``/``VALUES`` lists collapse to ``(...)``, so every call site maps to one fingerprint.
+    """
+    statement = _STRING.sub("?", statement)
+    statement = _PARAMETER.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _VALUES_LIST.sub("(...)", statement)
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    return statement[:FINGERPRINT_MAX_LENGTH]
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` timing how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        span = tracer.start_span("db.pool.checkout", kind=SpanKind.CLIENT, attributes={"db.pool": self.logging_name})
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(pool=self.logging_name).observe(time.perf_counter() - started)
+            span.end()
+
+
+def pool_status(engine: AsyncEngine) -> Dict[str, Any]:
+    pool = engine.pool
+    size, max_overflow = pool.size(), pool._max_overflow
+    return {
+        "checked_out": pool.checkedout(),
+        "overflow": max(0, pool.overflow()),
+        "size": size,
+        "max_overflow": max_overflow,
+        "capacity": size + max_overflow,
+    }
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """
+    Exports pool gauges and per-statement latency histograms and spans for ``engine``.
+
+    Gauges are updated on checkout and checkin rather than computed at scrape time, since the
+    multiprocess collector only sees values written by the workers.
+    """
+    checked_out = DB_POOL_CHECKED_OUT.labels(pool=name)
+    overflow = DB_POOL_OVERFLOW.labels(pool=name)
+    DB_POOL_CAPACITY.labels(pool=name).set(engine.pool.size() + engine.pool._max_overflow)
+
+    sync_engine = engine.sync_engine
+
+    # listeners on the engine follow the pool when dispose() replaces it
+    @event.listens_for(sync_engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_out.inc()
+        overflow.set(max(0, engine.pool.overflow()))
+
+    @event.listens_for(sync_engine, "checkin")
+    def checkin(dbapi_connection, connection_record):
+        checked_out.dec()
+        overflow.set(max(0, engine.pool.overflow()))
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statement_fingerprint = fingerprint(statement)
+        span = tracer.start_span(
+            statement_fingerprint.split(" ", 1)[0],
+            kind=SpanKind.CLIENT,
+            attributes={"db.system": "postgresql", "db.statement": statement_fingerprint, "db.pool": name},
+        )
+        context._instrumentation = (statement_fingerprint, span, time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statement_fingerprint, span, started = context._instrumentation
+        DB_STATEMENT_DURATION.labels(pool=name, statement=statement_fingerprint).observe(time.perf_counter() - started)
+        span.end()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        context = exception_context.execution_context
+        instrumentation = getattr(context, "_instrumentation", None)
+        if instrumentation is None:
+            return
+
+        statement_fingerprint, span, started = instrumentation
+        DB_STATEMENT_DURATION.labels(pool=name, statement=statement_fingerprint).observe(time.perf_counter() - started)
+        span.set_status(Status(StatusCode.ERROR, str(exception_context.original_exception)))
+        span.end()
@@ -1,11 +1,11 @@
 # stdlib
 
 # thirdparty
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
 from sqlalchemy.sql import func
 
 # project
-from db.db_setup import Base
+from db.base import Base
 
 
 class PlayerModel(Base):
@@ -15,3 +15,7 @@ class PlayerModel(Base):
     username = Column(String(32), nullable=False, comment="Username")
     created_at = Column(DateTime, nullable=False, server_default=func.now(), comment="Created At")
     updated_at = Column(DateTime, nullable=True, comment="Updated At")
+    last_seen_at = Column(DateTime, nullable=True, comment="Last Seen At")
+    last_session_at = Column(DateTime, nullable=True, comment="Last Session At")
+    sessions_count = Column(Integer, nullable=False, server_default="0", comment="Sessions Count")
+    score = Column(BigInteger, nullable=False, server_default="0", comment="Best Leaderboard Score")
@@ -0,0 +1,19 @@
+# stdlib
+from typing import Optional
+
+# thirdparty
+from pydantic import BaseModel, Field
+
+# Redis scores are doubles, which hold integers exactly up to 2 ** 53
+MAX_SCORE = 2**53 - 1
+
+
+class LeaderboardEntrySchema(BaseModel):
+    rank: int
+    player_id: int
+    username: Optional[str]
+    score: int
+
+
+class ScoreSubmit(BaseModel):
+    score: int = Field(ge=0, le=MAX_SCORE)
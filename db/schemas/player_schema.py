@@ -1,9 +1,12 @@
 # stdlib
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 # thirdparty
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+# project
+import settings
 
 
 class PlayerInfoSchema(BaseModel):
@@ -20,3 +23,7 @@ class PlayerSchema(BaseModel):
 class PlayerCreate(BaseModel):
     player_id: int
     username: Optional[str] = None
+
+
+class PlayerLookup(BaseModel):
+    player_ids: List[int] = Field(min_length=1, max_length=settings.PLAYERS_LOOKUP_MAX_IDS)
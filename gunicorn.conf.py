@@ -0,0 +1,57 @@
+"""
+Production runner: ``gunicorn -c gunicorn.conf.py main:app``.
+
+Gunicorn supervises uvicorn workers: it replaces workers that exit, recycles them after
+``WORKER_MAX_REQUESTS`` (+ jitter) requests, reloads them one by one on SIGHUP and drains them on SIGTERM.
+Workers write their metrics to ``PROMETHEUS_MULTIPROC_DIR``, which ``/metrics`` aggregates.
+"""
+# stdlib
+import multiprocessing
+import os
+import shutil
+
+# thirdparty
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# must be set before prometheus_client is imported by any worker
+PROMETHEUS_MULTIPROC_DIR = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/mini-app-api-metrics")
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{int(os.getenv('PORT', 8000))}"
+worker_class = "uvicorn.workers.UvicornWorker"
+# proxies whose X-Forwarded-For is trusted, comma separated, so the per-IP rate limit sees the client behind the load
+# balancer instead of one address for everybody; "*" trusts any sender, so only when nothing else reaches the workers
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# Every worker opens its own primary and replica pools of pool size + max overflow connections each. Unless they are
+# set, both are derived from DATABASE_MAX_CONNECTIONS, the connections all workers together may open to one
+# database, which must stay below its max_connections; workers read them from the environment after the fork.
+DATABASE_MAX_CONNECTIONS = int(os.getenv("DATABASE_MAX_CONNECTIONS", 80))
+worker_connections = max(DATABASE_MAX_CONNECTIONS // workers, 2)
+for prefix in ("ASYNC_ENGINE", "ASYNC_REPLICA_ENGINE"):
+    if not os.getenv(f"{prefix}_POOL_SIZE"):
+        os.environ[f"{prefix}_POOL_SIZE"] = str(worker_connections // 2)
+    if not os.getenv(f"{prefix}_MAX_OVERFLOW"):
+        os.environ[f"{prefix}_MAX_OVERFLOW"] = str(worker_connections - int(os.environ[f"{prefix}_POOL_SIZE"]))
+
+max_requests = int(os.getenv("WORKER_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("WORKER_MAX_REQUESTS_JITTER", 1000))
+graceful_timeout = int(os.getenv("WORKER_GRACEFUL_TIMEOUT", 30))
+timeout = int(os.getenv("WORKER_TIMEOUT", 60))
+keepalive = int(os.getenv("WORKER_KEEPALIVE", 5))
+accesslog = "-"
+
+
+def on_starting(server):
+    # metric files of a previous run would be summed into this one
+    shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # thirdparty
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
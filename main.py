@@ -1,126 +1,135 @@
 # stdlib
-import json
+import asyncio
 import logging
+from contextlib import asynccontextmanager, suppress
 
 # thirdparty
-import uvicorn
-from fastapi import APIRouter, FastAPI, Request
+from fastapi import APIRouter, FastAPI
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.openapi.utils import get_openapi
-from starlette.responses import JSONResponse, RedirectResponse
+from redis.exceptions import RedisError
+from starlette.responses import RedirectResponse
 
 # project
 import settings
+from db.db_setup import database, redis_connection_pool
+from routers.admin import admin_router
+from routers.health import health_router
+from routers.leaderboard import leaderboard_router
 from routers.players import players_router
-from settings import PrometheusMiddleware, metrics, setting_otlp
+from services.leaderboard_service import leaderboard_service
+from services.player_activity_service import player_activity_tracker
+from services.player_cache_service import player_cache_service
+from services.player_filter_service import player_filter_service
+from settings import PrometheusMiddleware, metrics, setting_instrumentation, setting_otlp
+from utils.auth import InitDataAuthMiddleware
 from utils.helpers import (
     CustomHTTPException,
     custom_exception_handler,
     general_exception_handler,
-    validate_mini_app_data,
     validation_exception_handler,
 )
+from utils.http_cache import NotModifiedException, not_modified_exception_handler
+from utils.log import AccessLogFilter, log_pipeline
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Creates the per-process resources after the fork and releases them on shutdown."""
+    log_pipeline.start()
+    database.start()
+    tracer_provider = setting_otlp("mini-app-api", settings.OTLP_GRPC_ENDPOINT)
+    cache_listener = asyncio.create_task(player_cache_service.listen())
+    activity_flusher = asyncio.create_task(player_activity_tracker.run())
+    leaderboard_sync = asyncio.create_task(leaderboard_service.run())
+    filter_rebuild = asyncio.create_task(player_filter_service.run())
+    yield
+    for task in (cache_listener, activity_flusher, leaderboard_sync, filter_rebuild):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    # what was buffered since the last flush, written before the engines close
+    await player_activity_tracker.flush()
+    with suppress(RedisError):
+        await leaderboard_service.sync()
+    await database.dispose()
+    await redis_connection_pool.disconnect()
+    if tracer_provider is not None:
+        tracer_provider.force_flush(settings.OTLP_FLUSH_TIMEOUT_MS)
+    log_pipeline.stop()
+
+
+logging.getLogger("uvicorn.access").addFilter(AccessLogFilter())
+
+
+def create_app() -> FastAPI:
+    """
+    Builds the application; nothing is connected until its lifespan starts.
+
+    Middleware and instrumentation are set up here, since Starlette builds the middleware stack on startup.
+    """
+    app = FastAPI(title="Mini-App-API", version="0.0.1", lifespan=lifespan)
+
+    app.add_middleware(InitDataAuthMiddleware)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
-root_router = APIRouter(prefix="/api/v1")
-
-
-app = FastAPI(title="Mini-App-API", version="0.0.1")
-
-
-@app.middleware("http")
-async def data_validation_middleware(request: Request, call_next):
-    if request.method in ["POST", "PUT"]:
-        body = await request.json()
-        initData = body.get("initData")
-
-        if not initData:
-            return JSONResponse(status_code=401, content="UNAUTHORIZED")
-
-        is_valid, data = validate_mini_app_data(initData)
-
-        if not is_valid:
-            return JSONResponse(status_code=401, content="UNAUTHORIZED")
-
-        user = json.loads(data.get("user"))
-
-        user_id = user.get("id")
-        username = user.get("username", "")
-        first_name = user.get("first_name", "")
-
-        if not user_id:
-            return JSONResponse(status_code=401, content="UNAUTHORIZED")
-
-        body["player_id"] = user_id
-        body["username"] = username
-        body["first_name"] = first_name
-
-        request._body = json.dumps(body).encode("utf-8")
-
-    response = await call_next(request)
-    return response
-
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-root_router.include_router(players_router)
-
-app.include_router(root_router)
-
-
-@app.get("/")
-async def root():
-    return RedirectResponse(url="/docs")
-
-
-class EndpointFilter(logging.Filter):
-    def filter(self, record: logging.LogRecord) -> bool:
-        return record.getMessage().find("GET /metrics") == -1
-
-
-class Non200Filter(logging.Filter):
-    def filter(self, record: logging.LogRecord) -> bool:
-        return not record.getMessage().endswith("200")
-
-
-logging.getLogger("uvicorn.access").addFilter(EndpointFilter())
-logging.getLogger("uvicorn.access").addFilter(Non200Filter())
-
-app.add_middleware(PrometheusMiddleware, app_name="mini-app-api")
-app.add_route("/metrics", metrics)
-
-setting_otlp(app, "mini-app-api", settings.OTLP_GRPC_ENDPOINT)
+    app.add_middleware(
+        GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE, compresslevel=settings.GZIP_COMPRESS_LEVEL
+    )
 
-app.add_exception_handler(RequestValidationError, validation_exception_handler)
-app.add_exception_handler(CustomHTTPException, custom_exception_handler)
-app.add_exception_handler(Exception, general_exception_handler)
+    root_router = APIRouter(prefix="/api/v1")
+    root_router.include_router(players_router)
+    root_router.include_router(leaderboard_router)
+    root_router.include_router(admin_router)
+
+    app.include_router(root_router)
+    app.include_router(health_router)
+
+    @app.get("/")
+    async def root():
+        return RedirectResponse(url="/docs")
+
+    app.add_middleware(PrometheusMiddleware, app_name="mini-app-api")
+    app.add_route("/metrics", metrics)
+
+    if settings.TRACING_ENABLED:
+        setting_instrumentation(app)
+
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    app.add_exception_handler(CustomHTTPException, custom_exception_handler)
+    app.add_exception_handler(NotModifiedException, not_modified_exception_handler)
+    app.add_exception_handler(Exception, general_exception_handler)
+
+    def openapi_specs():
+        if app.openapi_schema:
+            return app.openapi_schema
+        openapi_schema = get_openapi(
+            title="Mini App",
+            version="1.0.0",
+            description="Mini App API Open-API Specification",
+            routes=app.routes,
+        )
+        app.openapi_schema = openapi_schema
+        return app.openapi_schema
 
+    app.openapi = openapi_specs
 
-def openapi_specs():
-    if app.openapi_schema:
-        return app.openapi_schema
-    openapi_schema = get_openapi(
-        title="Mini App",
-        version="1.0.0",
-        description="Mini App API Open-API Specification",
-        routes=app.routes,
-    )
-    app.openapi_schema = openapi_schema
-    return app.openapi_schema
+    return app
 
 
-app.openapi = openapi_specs
+app = create_app()
 
 if __name__ == "__main__":
-    log_config = uvicorn.config.LOGGING_CONFIG
-    log_config["formatters"]["access"]["fmt"] = (
-        "%(asctime)s %(levelname)s [%(name)s] [%(filename)s:%(lineno)d] "
-        "[trace_id=%(otelTraceID)s span_id=%(otelSpanID)s resource.service.name=%(otelServiceName)s] - %(message)s"
-    )
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_config=log_config)
+    # thirdparty
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=8000)
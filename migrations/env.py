@@ -8,7 +8,7 @@ from dotenv import load_dotenv
 from sqlalchemy import create_engine
 
 # project
-from db.db_setup import Base
+from db.base import Base
 
 load_dotenv()
 
@@ -0,0 +1,27 @@
+"""add username search indexes
+
+Revision ID: f1efa966d7f1
+Revises: 6b5dae2e4e11
+Create Date: 2026-10-17 10:00:00.000000
+
+
+"""
+# thirdparty
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f1efa966d7f1"
+down_revision = "6b5dae2e4e11"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE INDEX ix_players_username_trgm ON players USING gin (lower(username) gin_trgm_ops)")
+    op.execute('CREATE INDEX ix_players_username_prefix ON players ((lower(username) COLLATE "C"), id)')
+
+
+def downgrade() -> None:
+    op.drop_index("ix_players_username_prefix", table_name="players")
+    op.drop_index("ix_players_username_trgm", table_name="players")
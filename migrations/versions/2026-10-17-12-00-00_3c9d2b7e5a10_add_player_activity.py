@@ -0,0 +1,32 @@
+"""add player activity
+
+Revision ID: 3c9d2b7e5a10
+Revises: f1efa966d7f1
+Create Date: 2026-10-17 12:00:00.000000
+
+
+"""
+# thirdparty
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3c9d2b7e5a10"
+down_revision = "f1efa966d7f1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("players", sa.Column("last_seen_at", sa.DateTime(), nullable=True, comment="Last Seen At"))
+    op.add_column("players", sa.Column("last_session_at", sa.DateTime(), nullable=True, comment="Last Session At"))
+    op.add_column(
+        "players",
+        sa.Column("sessions_count", sa.Integer(), nullable=False, server_default="0", comment="Sessions Count"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("players", "sessions_count")
+    op.drop_column("players", "last_session_at")
+    op.drop_column("players", "last_seen_at")
@@ -0,0 +1,28 @@
+"""add player score
+
+Revision ID: 8e41f0c2d6b3
+Revises: 3c9d2b7e5a10
+Create Date: 2026-10-17 13:00:00.000000
+
+
+"""
+# thirdparty
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8e41f0c2d6b3"
+down_revision = "3c9d2b7e5a10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "players",
+        sa.Column("score", sa.BigInteger(), nullable=False, server_default="0", comment="Best Leaderboard Score"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("players", "score")
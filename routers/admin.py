@@ -0,0 +1,33 @@
+# stdlib
+from datetime import datetime
+from typing import Optional
+
+# thirdparty
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+# project
+from services.player_export_service import ExportFormat, export_players
+from utils.auth import require_admin
+
+admin_router = APIRouter(tags=["3. Admin"], prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+@admin_router.get(
+    "/players/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/csv": {}, "application/x-ndjson": {}}}},
+)
+async def export_players_table(
+    export_format: ExportFormat = Query(default=ExportFormat.CSV, alias="format"),
+    created_from: Optional[datetime] = Query(default=None),
+    created_to: Optional[datetime] = Query(default=None),
+):
+    """
+    Export all players, or those created in [created_from, created_to), as CSV or NDJSON
+    """
+    return StreamingResponse(
+        export_players(export_format, created_from=created_from, created_to=created_to),
+        media_type=export_format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="players.{export_format.value}"'},
+    )
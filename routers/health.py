@@ -0,0 +1,31 @@
+# thirdparty
+from fastapi import APIRouter, status
+
+# project
+import settings
+from db.db_setup import database
+from db.instrumentation import pool_status
+from utils.helpers import response_wrapper_result
+
+health_router = APIRouter(tags=["0. Health"], prefix="/health")
+
+
+@health_router.get("/ready")
+async def ready():
+    """
+    Readiness probe: 503 while a database pool is saturated, so the load balancer drains this worker
+    """
+    pools = {"primary": pool_status(database.engine)}
+    if database.has_replica:
+        pools["replica"] = pool_status(database.replica_engine)
+
+    saturated = [
+        name
+        for name, pool in pools.items()
+        if pool["checked_out"] >= pool["capacity"] * settings.HEALTH_POOL_SATURATION
+    ]
+
+    return response_wrapper_result(
+        result={"ready": not saturated, "saturated": saturated, "pools": pools},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE if saturated else status.HTTP_200_OK,
+    )
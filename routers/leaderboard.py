@@ -0,0 +1,92 @@
+# thirdparty
+from fastapi import APIRouter, Depends, Query
+
+# project
+import settings
+from db.schemas.common_schema import ResultResponse, ResultsResponse
+from db.schemas.leaderboard_schema import LeaderboardEntrySchema, ScoreSubmit
+from db.schemas.player_schema import PlayerCreate
+from services.leaderboard_service import leaderboard_service
+from services.player_service import create_or_get_player
+from services.rate_limit_service import RateLimit
+from utils.auth import get_current_player
+from utils.errors import ErrorResponseEnum
+from utils.helpers import CustomHTTPException, response_wrapper_result, response_wrapper_results
+from utils.init_data import InitDataUser
+from utils.pagination import get_pagination
+
+leaderboard_router = APIRouter(tags=["2. Leaderboard"], prefix="/leaderboard")
+
+
+@leaderboard_router.get(
+    "",
+    response_model=ResultsResponse[LeaderboardEntrySchema],
+    dependencies=[Depends(RateLimit("leaderboard_read", settings.RATE_LIMIT_PLAYERS_READ))],
+)
+async def get_leaderboard(
+    page: int = Query(default=1, ge=1),
+    limit: int = Query(default=settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+):
+    """
+    Get top players
+    """
+    entries, count = await leaderboard_service.top(offset=(page - 1) * limit, limit=limit)
+
+    return response_wrapper_results(results=entries, pagination=get_pagination(page=page, limit=limit, count=count))
+
+
+@leaderboard_router.get(
+    "/me",
+    response_model=ResultsResponse[LeaderboardEntrySchema],
+    dependencies=[Depends(RateLimit("leaderboard_read", settings.RATE_LIMIT_PLAYERS_READ))],
+)
+async def get_leaderboard_around_me(
+    radius: int = Query(default=5, ge=0, le=settings.LEADERBOARD_MAX_RADIUS),
+    current_player: InitDataUser = Depends(get_current_player),
+):
+    """
+    Get the current player's rank and neighbours
+    """
+    entries = await leaderboard_service.around(player_id=current_player.id, radius=radius)
+
+    if entries is None:
+        raise CustomHTTPException(error_response=ErrorResponseEnum.PLAYER_NOT_RANKED)
+
+    return response_wrapper_results(results=entries)
+
+
+@leaderboard_router.get(
+    "/{player_id}",
+    response_model=ResultResponse[LeaderboardEntrySchema],
+    dependencies=[Depends(RateLimit("leaderboard_read", settings.RATE_LIMIT_PLAYERS_READ))],
+)
+async def get_leaderboard_entry(player_id: int):
+    """
+    Get player rank
+    """
+    entry = await leaderboard_service.entry(player_id=player_id)
+
+    if entry is None:
+        raise CustomHTTPException(error_response=ErrorResponseEnum.PLAYER_NOT_RANKED)
+
+    return response_wrapper_result(result=entry)
+
+
+@leaderboard_router.post(
+    "/score",
+    response_model=ResultResponse[LeaderboardEntrySchema],
+    dependencies=[Depends(RateLimit("leaderboard_write", settings.RATE_LIMIT_PLAYERS_WRITE))],
+)
+async def submit_score(body: ScoreSubmit, current_player: InitDataUser = Depends(get_current_player)):
+    """
+    Submit score; the best score of the player is kept
+    """
+    # the row receives the score on the next sync
+    player = await create_or_get_player(PlayerCreate(player_id=current_player.id, username=current_player.username))
+
+    if not player:
+        raise CustomHTTPException(error_response=ErrorResponseEnum.USERNAME_TAKEN)
+
+    await leaderboard_service.submit(player_id=current_player.id, score=body.score)
+
+    return response_wrapper_result(result=await leaderboard_service.entry(player_id=current_player.id))
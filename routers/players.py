@@ -1,70 +1,131 @@
 # stdlib
-from typing import Union
+from datetime import datetime
+from typing import Optional, Union
 
 # thirdparty
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # project
-from db.db_setup import get_session
+import settings
+from db.db_setup import get_read_session, pin_to_primary
 from db.schemas.common_schema import ResultResponse, ResultsResponse
-from db.schemas.player_schema import PlayerCreate, PlayerSchema
-from services.player_service import create_or_get_player, get_player, get_players_by_ids, get_players_by_username
+from db.schemas.player_schema import PlayerCreate, PlayerLookup, PlayerSchema
+from services.player_search_service import SearchMode, search_players
+from services.player_service import create_or_get_player, get_player, get_players_by_ids, stream_players
+from services.rate_limit_service import RateLimit
+from utils.auth import get_current_player
 from utils.errors import ErrorResponseEnum
 from utils.helpers import CustomHTTPException, response_wrapper_result, response_wrapper_results
+from utils.http_cache import HTTPCache
+from utils.init_data import InitDataUser
 
 players_router = APIRouter(tags=["1. Players"], prefix="/players")
 
+players_http_cache = HTTPCache(settings.PLAYERS_CACHE_CONTROL)
+players_search_http_cache = HTTPCache(settings.PLAYERS_SEARCH_CACHE_CONTROL)
 
-@players_router.post("", response_model=ResultResponse[PlayerSchema])
-async def get_current_or_create_player(player: PlayerCreate, session: AsyncSession = Depends(get_session)):
+
+@players_router.post(
+    "",
+    response_model=ResultResponse[PlayerSchema],
+    dependencies=[Depends(RateLimit("players_write", settings.RATE_LIMIT_PLAYERS_WRITE))],
+)
+async def get_current_or_create_player(current_player: InitDataUser = Depends(get_current_player)):
     """
     Get or create player
     """
-    player = await create_or_get_player(session=session, player=player)
+    player = PlayerCreate(player_id=current_player.id, username=current_player.username)
+    player = await create_or_get_player(player=player)
+
+    if not player:
+        raise CustomHTTPException(error_response=ErrorResponseEnum.USERNAME_TAKEN)
 
-    return response_wrapper_result(result=PlayerSchema(**player))
+    await pin_to_primary(current_player.id)
 
+    return response_wrapper_result(result=player)
 
-@players_router.get("/{player_ids}", response_model=Union[ResultsResponse[PlayerSchema], ResultResponse[PlayerSchema]])
+
+@players_router.post(
+    "/lookup",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+    dependencies=[Depends(RateLimit("players_lookup", settings.RATE_LIMIT_PLAYERS_LOOKUP))],
+)
+async def lookup_players(lookup: PlayerLookup):
+    """
+    Look up players by id; streams NDJSON, one player per line, then the unknown ids and a summary
+    """
+    return StreamingResponse(
+        stream_players(lookup.player_ids, settings.PLAYERS_LOOKUP_CHUNK_SIZE), media_type="application/x-ndjson"
+    )
+
+
+@players_router.get(
+    "/{player_ids}",
+    response_model=Union[ResultsResponse[PlayerSchema], ResultResponse[PlayerSchema]],
+    dependencies=[
+        Depends(RateLimit("players_read", settings.RATE_LIMIT_PLAYERS_READ)),
+        Depends(players_http_cache),
+    ],
+)
 async def get_other_players(
+    request: Request,
     player_ids: str,
     page: int = Query(default=1, ge=1),
-    limit: int = Query(default=20, ge=1),
-    session: AsyncSession = Depends(get_session),
+    limit: int = Query(default=settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+    cursor: Optional[str] = Query(default=None),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Get other players
     """
     if "," in player_ids:
         players, pagination = await get_players_by_ids(
-            session=session, player_ids=[int(number) for number in player_ids.split(",")], page=page, limit=limit
+            session=session,
+            player_ids=[int(number) for number in player_ids.split(",")],
+            page=page,
+            limit=limit,
+            cursor=cursor,
         )
 
-        return response_wrapper_results(
-            results=[PlayerSchema(**player.__dict__) for player in players], pagination=pagination
-        )
+        return players_http_cache.respond(request, response_wrapper_results(results=players, pagination=pagination))
 
     player = await get_player(session=session, player_id=int(player_ids))
 
     if not player:
         raise CustomHTTPException(error_response=ErrorResponseEnum.PLAYER_NOT_FOUND)
 
-    return response_wrapper_result(result=PlayerSchema(**player.__dict__))
+    last_modified = datetime.fromisoformat(player["updated_at"] or player["created_at"])
+    return players_http_cache.respond(request, response_wrapper_result(result=player), last_modified=last_modified)
 
 
-@players_router.get("/username/{username}", response_model=ResultsResponse[PlayerSchema])
-async def search_players(
+@players_router.get(
+    "/username/{username}",
+    response_model=ResultsResponse[PlayerSchema],
+    dependencies=[
+        Depends(RateLimit("players_search", settings.RATE_LIMIT_PLAYERS_SEARCH)),
+        Depends(players_search_http_cache),
+    ],
+)
+async def search_players_by_username(
+    request: Request,
     username: str,
     page: int = Query(default=1, ge=1),
-    limit: int = Query(default=20, ge=1),
-    session: AsyncSession = Depends(get_session),
+    limit: int = Query(default=settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+    cursor: Optional[str] = Query(default=None),
+    with_count: bool = Query(default=True),
+    mode: SearchMode = Query(default=SearchMode.AUTO),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Search users by username
     """
-    players, pagination = await get_players_by_username(session=session, username=username, page=page, limit=limit)
+    players, pagination = await search_players(
+        session=session, username=username, page=page, limit=limit, cursor=cursor, with_count=with_count, mode=mode
+    )
 
-    return response_wrapper_results(
-        results=[PlayerSchema(**player.__dict__) for player in players], pagination=pagination
+    return players_search_http_cache.respond(
+        request, response_wrapper_results(results=players, pagination=pagination, schema=PlayerSchema)
     )
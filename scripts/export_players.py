@@ -0,0 +1,39 @@
+"""
+Exports the players table as CSV or NDJSON to a file or stdout, streaming from a server-side cursor.
+
+Usage: python -m scripts.export_players [--format csv|ndjson] [--created-from 2026-01-01] [--created-to ...]
+    [--output players.csv]
+"""
+
+# stdlib
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+
+# project
+from db.db_setup import database
+from services.player_export_service import ExportFormat, export_players
+
+
+async def main(args: argparse.Namespace) -> None:
+    database.start()
+    try:
+        output = open(args.output, "wb") if args.output else sys.stdout.buffer
+        try:
+            async for chunk in export_players(args.format, created_from=args.created_from, created_to=args.created_to):
+                output.write(chunk)
+        finally:
+            if args.output:
+                output.close()
+    finally:
+        await database.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--format", type=ExportFormat, choices=list(ExportFormat), default=ExportFormat.CSV)
+    parser.add_argument("--created-from", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--created-to", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--output", default=None)
+    asyncio.run(main(parser.parse_args()))
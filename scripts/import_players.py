@@ -0,0 +1,62 @@
+"""
+Bulk-loads players from a CSV (``id,username`` header) or NDJSON file through COPY, resuming an interrupted import
+from its checkpoint; existing players are kept as they are.
+
+Usage: python -m scripts.import_players players.csv [--format csv|ndjson] [--checkpoint players.csv.checkpoint]
+    [--rejects rejects.tsv] [--batch-size 10000] [--restart]
+"""
+
+# stdlib
+import argparse
+import asyncio
+import sys
+import time
+
+# project
+import settings
+from db.db_setup import database, redis_connection_pool
+from services.player_import_service import ImportFormat, ImportProgress, import_players
+
+
+def progress_printer():
+    started = time.monotonic()
+
+    def print_progress(progress: ImportProgress) -> None:
+        done = progress.offset / progress.size * 100 if progress.size else 100
+        rate = progress.read / max(time.monotonic() - started, 1e-9)
+        print(
+            f"{done:5.1f}% {progress.read} read, {progress.inserted} inserted, {progress.rejected} rejected, "
+            f"{rate:.0f} rows/s",
+            file=sys.stderr,
+        )
+
+    return print_progress
+
+
+async def main(args: argparse.Namespace) -> None:
+    database.start()
+    try:
+        progress = await import_players(
+            args.path,
+            args.format,
+            checkpoint_path=args.checkpoint,
+            rejects_path=args.rejects,
+            batch_size=args.batch_size,
+            restart=args.restart,
+            on_progress=progress_printer(),
+        )
+        print(f"{progress.read} read, {progress.inserted} inserted, {progress.rejected} rejected", file=sys.stderr)
+    finally:
+        await database.dispose()
+        await redis_connection_pool.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--format", type=ImportFormat, choices=list(ImportFormat), default=ImportFormat.CSV)
+    parser.add_argument("--checkpoint", default=None)
+    parser.add_argument("--rejects", default=None)
+    parser.add_argument("--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,28 @@
+"""
+Re-seeds the Redis leaderboard from ``players.score``, e.g. after Redis lost its data.
+
+Scores submitted while it runs are kept. Usage: python -m scripts.rebuild_leaderboard
+"""
+# stdlib
+import asyncio
+
+# project
+from db.db_setup import database, redis_connection_pool
+from services.leaderboard_service import leaderboard_service
+
+
+async def main() -> None:
+    database.start()
+    try:
+        # scores not yet synced would otherwise only survive through the merge
+        synced = await leaderboard_service.sync()
+        count = await leaderboard_service.rebuild()
+    finally:
+        await database.dispose()
+        await redis_connection_pool.disconnect()
+
+    print(f"Synced {synced} pending scores, rebuilt the leaderboard with {count} players")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
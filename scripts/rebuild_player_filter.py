@@ -0,0 +1,27 @@
+"""
+Fills the Redis player existence filter from ``players.id``, e.g. after Redis lost its data or an add failed
+(``player_filter_add_failures_total``).
+
+Bits added while it runs are kept. Usage: python -m scripts.rebuild_player_filter
+"""
+# stdlib
+import asyncio
+
+# project
+from db.db_setup import database, redis_connection_pool
+from services.player_filter_service import player_filter_service
+
+
+async def main() -> None:
+    database.start()
+    try:
+        count = await player_filter_service.rebuild()
+    finally:
+        await database.dispose()
+        await redis_connection_pool.disconnect()
+
+    print(f"Rebuilt the player filter with {count} players")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,201 @@
+# stdlib
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+# thirdparty
+from prometheus_client import Counter
+from redis.exceptions import RedisError
+from sqlalchemy import text
+
+# project
+import settings
+from db.bulk import values_list
+from db.db_setup import async_read_session, async_session, redis_connection_pool
+from services.player_cache_service import player_cache_service
+from services.player_service import player_loader
+from services.redis_service import RedisService
+from settings import logger
+
+LEADERBOARD_SYNCED = Counter(
+    "leaderboard_synced_total", "Total count of leaderboard scores copied to PostgreSQL by result.", ["result"]
+)
+
+# scores only grow, so a score written twice or out of order is harmless
+SCORES_UPDATE = """
+    UPDATE players AS p
+    SET score = GREATEST(p.score, v.score)
+    FROM {values}
+    WHERE p.id = v.id
+"""
+SCORES_COLUMNS = {"id": "integer", "score": "bigint"}
+SCORES_PAGE = "SELECT id, score FROM players WHERE score > 0 AND id > :after_id ORDER BY id LIMIT :limit"
+
+
+class LeaderboardService:
+    """
+    Player ranking by best score, kept in a Redis sorted set; top-N, around-me and rank lookups are O(log n).
+
+    Submitted scores go to the sorted set, and the ids of the players who submitted them go to a Redis set.
+    ``sync`` pops those ids and copies their scores to ``players.score`` in bulk. Each batch is taken by one
+    worker, and a batch that fails to write is put back. ``rebuild`` re-seeds the sorted set from PostgreSQL.
+    Ranks start at 1; Redis orders equal scores by member, the player id as a string.
+    """
+
+    def __init__(
+        self, redis_service: RedisService, sync_interval: float, batch_size: int, key: str = "leaderboard:players"
+    ) -> None:
+        self.redis = redis_service.client
+        self.sync_interval = sync_interval
+        self.batch_size = batch_size
+        self.key = key
+        self.dirty_key = f"{key}:dirty"
+        self.rebuild_lock_key = f"{key}:rebuild-lock"
+
+    async def submit(self, player_id: int, score: int) -> None:
+        """Records ``score`` when it beats the player's best."""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(self.key, {str(player_id): score}, gt=True)
+            pipe.sadd(self.dirty_key, player_id)
+            await pipe.execute()
+
+    async def top(self, offset: int, limit: int) -> Tuple[List[dict], int]:
+        """A page of the ranking and the number of ranked players."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zrevrange(self.key, offset, offset + limit - 1, withscores=True)
+            pipe.zcard(self.key)
+            members, count = await pipe.execute()
+
+        return await self._entries(members, first_rank=offset + 1), count
+
+    async def around(self, player_id: int, radius: int) -> Optional[List[dict]]:
+        """The player's entry with up to ``radius`` neighbours on each side; ``None`` when not ranked."""
+        rank = await self.redis.zrevrank(self.key, str(player_id))
+        if rank is None:
+            return None
+
+        start = max(0, rank - radius)
+        members = await self.redis.zrevrange(self.key, start, rank + radius, withscores=True)
+        return await self._entries(members, first_rank=start + 1)
+
+    async def entry(self, player_id: int) -> Optional[dict]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zrevrank(self.key, str(player_id))
+            pipe.zscore(self.key, str(player_id))
+            rank, score = await pipe.execute()
+
+        if rank is None:
+            return None
+
+        entries = await self._entries([(str(player_id), score)], first_rank=rank + 1)
+        return entries[0]
+
+    @staticmethod
+    async def _entries(members: List[Tuple[str, float]], first_rank: int) -> List[dict]:
+        player_ids = [int(member) for member, _ in members]
+        players = await player_cache_service.get_many(player_ids)
+
+        missing = [player_id for player_id in player_ids if player_id not in players]
+        if missing:
+            loaded = await player_loader.load_many(missing)
+            players.update({player["id"]: player for player in loaded if player is not None})
+
+        return [
+            {
+                "rank": first_rank + i,
+                "player_id": player_id,
+                "username": players[player_id]["username"] if player_id in players else None,
+                "score": int(score),
+            }
+            for i, (player_id, (_, score)) in enumerate(zip(player_ids, members))
+        ]
+
+    async def run(self) -> None:
+        """Seeds an empty sorted set, then syncs periodically; runs until cancelled."""
+        try:
+            if not await self.redis.exists(self.key) and await self.redis.set(
+                self.rebuild_lock_key, 1, nx=True, ex=300
+            ):
+                logger.info(f"Leaderboard rebuilt with {await self.rebuild()} players")
+        except Exception as e:
+            logger.warning(f"Leaderboard rebuild failed: {e}")
+
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except RedisError as e:
+                logger.warning(f"Leaderboard sync failed: {e}")
+
+    async def sync(self) -> int:
+        """Copies the scores submitted since the last sync to PostgreSQL; returns the number of players."""
+        synced = 0
+        while True:
+            members = await self.redis.spop(self.dirty_key, self.batch_size)
+            if not members:
+                return synced
+
+            scores = await self.redis.zmscore(self.key, members)
+            # rows locked in the same order by every worker cannot deadlock
+            rows = sorted((int(member), int(score)) for member, score in zip(members, scores) if score is not None)
+            try:
+                await self.write(rows)
+            except asyncio.CancelledError:
+                await asyncio.shield(self.redis.sadd(self.dirty_key, *members))
+                raise
+            except Exception as e:
+                logger.warning(f"Leaderboard score write failed: {e}")
+                LEADERBOARD_SYNCED.labels(result="error").inc(len(rows))
+                await self.redis.sadd(self.dirty_key, *members)
+                return synced
+
+            LEADERBOARD_SYNCED.labels(result="written").inc(len(rows))
+            synced += len(rows)
+            if len(members) < self.batch_size:
+                return synced
+
+    @staticmethod
+    async def write(rows: List[Tuple[int, int]]) -> None:
+        if not rows:
+            return
+
+        values, params = values_list(SCORES_COLUMNS, rows)
+        async with async_session.begin() as session:
+            await session.execute(text(SCORES_UPDATE.format(values=values)), params)
+
+    async def rebuild(self) -> int:
+        """
+        Re-seeds the sorted set from ``players.score``; returns the number of players read.
+
+        The set is built under another key and swapped in atomically. Scores submitted meanwhile are merged
+        in, the higher score winning, so nothing is lost before its sync.
+        """
+        staging_key = f"{self.key}:rebuild"
+        await self.redis.delete(staging_key)
+
+        count, after_id = 0, 0
+        while True:
+            async with async_read_session() as session:
+                result = await session.execute(text(SCORES_PAGE), {"after_id": after_id, "limit": self.batch_size})
+                rows = result.all()
+            if not rows:
+                break
+
+            scores: Dict[str, int] = {str(player_id): score for player_id, score in rows}
+            await self.redis.zadd(staging_key, scores)
+            count += len(rows)
+            after_id = rows[-1][0]
+
+        if count:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.zunionstore(staging_key, [staging_key, self.key], aggregate="MAX")
+                pipe.rename(staging_key, self.key)
+                await pipe.execute()
+
+        return count
+
+
+leaderboard_service = LeaderboardService(
+    RedisService(redis_connection_pool),
+    sync_interval=settings.LEADERBOARD_SYNC_INTERVAL,
+    batch_size=settings.LEADERBOARD_SYNC_BATCH_SIZE,
+)
@@ -0,0 +1,136 @@
+# stdlib
+import asyncio
+import time
+from contextlib import suppress
+from typing import Dict, List, Optional, Tuple
+
+# thirdparty
+from prometheus_client import Counter, Gauge
+from sqlalchemy import text
+
+# project
+import settings
+from db.bulk import values_list
+from db.db_setup import async_session
+from services.player_service import in_player_id_range
+from settings import logger
+from utils.init_data import InitDataUser
+
+PLAYER_ACTIVITY_PENDING = Gauge(
+    "player_activity_pending",
+    "Number of players whose activity is buffered and not yet written.",
+    multiprocess_mode="livesum",
+)
+PLAYER_ACTIVITY_WRITES = Counter(
+    "player_activity_writes_total", "Total count of player activity rows by write result.", ["result"]
+)
+
+# a new session is a newer initData ``auth_date``; the statement is idempotent, so rows may be written twice.
+# ``updated_at`` is left alone: it is the Last-Modified of the player, whose representation activity is not part of,
+# and bumping it on every visit would invalidate HTTP validators and cached players for nothing
+ACTIVITY_UPDATE = """
+    UPDATE players AS p
+    SET last_seen_at = GREATEST(p.last_seen_at, to_timestamp(v.seen_at)::timestamp),
+        last_session_at = GREATEST(p.last_session_at, to_timestamp(v.auth_date)::timestamp),
+        sessions_count = p.sessions_count + CASE
+            WHEN p.last_session_at IS NULL OR to_timestamp(v.auth_date)::timestamp > p.last_session_at THEN 1
+            ELSE 0
+        END
+    FROM {values}
+    WHERE p.id = v.id
+"""
+ACTIVITY_COLUMNS = {"id": "integer", "seen_at": "double precision", "auth_date": "bigint"}
+
+# player id -> (last seen at, newest auth_date)
+Activity = Tuple[int, Tuple[float, int]]
+
+
+class PlayerActivityTracker:
+    """
+    Write-behind buffer of the last-seen time and sessions of authenticated players.
+
+    ``record`` only updates an in-process dict. ``run`` writes the buffer every ``interval`` seconds, or as
+    soon as ``max_pending`` players are buffered, in ``UPDATE ... FROM (VALUES ...)`` statements of at most
+    ``batch_size`` rows; the lifespan calls ``flush`` once more on shutdown, so only a crash loses activity,
+    at most one interval of it. Failed batches are buffered again while there is room.
+    """
+
+    def __init__(self, interval: float, batch_size: int, max_pending: int) -> None:
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.pending: Dict[int, Tuple[float, int]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def record(self, player: InitDataUser) -> None:
+        # no player row can have such an id, and it would fail every batch it is written in
+        if not settings.PLAYER_ACTIVITY_ENABLED or not in_player_id_range(player.id):
+            return
+
+        previous = self.pending.get(player.id)
+        auth_date = player.auth_date if previous is None else max(previous[1], player.auth_date)
+        self.pending[player.id] = (time.time(), auth_date)
+
+        if previous is None:
+            PLAYER_ACTIVITY_PENDING.inc()
+            if len(self.pending) >= self.max_pending and self._wakeup is not None:
+                self._wakeup.set()
+
+    async def run(self) -> None:
+        """Writes the buffer periodically; runs until cancelled."""
+        self._wakeup = asyncio.Event()
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        batch, self.pending = self.pending, {}
+        PLAYER_ACTIVITY_PENDING.dec(len(batch))
+
+        # rows locked in the same order by every worker cannot deadlock
+        rows = sorted(batch.items())
+        for start in range(0, len(rows), self.batch_size):
+            chunk = rows[start : start + self.batch_size]
+            try:
+                await self.write(chunk)
+            except asyncio.CancelledError:
+                self._requeue(rows[start:])
+                raise
+            except Exception as e:
+                logger.warning(f"Player activity write failed: {e}")
+                PLAYER_ACTIVITY_WRITES.labels(result="error").inc(len(chunk))
+                self._requeue(chunk)
+            else:
+                PLAYER_ACTIVITY_WRITES.labels(result="written").inc(len(chunk))
+
+    @staticmethod
+    async def write(rows: List[Activity]) -> None:
+        values, params = values_list(
+            ACTIVITY_COLUMNS, [(player_id, seen_at, auth_date) for player_id, (seen_at, auth_date) in rows]
+        )
+        async with async_session.begin() as session:
+            await session.execute(text(ACTIVITY_UPDATE.format(values=values)), params)
+
+    def _requeue(self, rows: List[Activity]) -> None:
+        dropped = 0
+        for player_id, (seen_at, auth_date) in rows:
+            current = self.pending.get(player_id)
+            if current is not None:
+                self.pending[player_id] = (max(current[0], seen_at), max(current[1], auth_date))
+            elif len(self.pending) < self.max_pending:
+                self.pending[player_id] = (seen_at, auth_date)
+                PLAYER_ACTIVITY_PENDING.inc()
+            else:
+                dropped += 1
+
+        if dropped:
+            PLAYER_ACTIVITY_WRITES.labels(result="dropped").inc(dropped)
+
+
+player_activity_tracker = PlayerActivityTracker(
+    interval=settings.PLAYER_ACTIVITY_FLUSH_INTERVAL,
+    batch_size=settings.PLAYER_ACTIVITY_BATCH_SIZE,
+    max_pending=settings.PLAYER_ACTIVITY_MAX_PENDING,
+)
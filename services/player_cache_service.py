@@ -0,0 +1,136 @@
+# stdlib
+import asyncio
+import json
+from typing import Dict, Iterable, List, Optional
+
+# thirdparty
+from prometheus_client import Counter
+from redis.exceptions import RedisError
+
+# project
+import settings
+from db.db_setup import redis_connection_pool
+from services.redis_service import RedisService
+from settings import logger
+from utils.cache import TTLCache
+
+PLAYER_CACHE_HITS = Counter("player_cache_hits_total", "Total count of player cache hits by tier.", ["tier"])
+PLAYER_CACHE_MISSES = Counter("player_cache_misses_total", "Total count of player cache misses by tier.", ["tier"])
+PLAYER_CACHE_EVICTIONS = Counter("player_cache_evictions_total", "Total count of local player cache LRU evictions.")
+
+LOCAL_HITS = PLAYER_CACHE_HITS.labels(tier="local")
+LOCAL_MISSES = PLAYER_CACHE_MISSES.labels(tier="local")
+REDIS_HITS = PLAYER_CACHE_HITS.labels(tier="redis")
+REDIS_MISSES = PLAYER_CACHE_MISSES.labels(tier="redis")
+
+
+class PlayerCacheService:
+    """
+    Read-through player cache: an in-process LRU with a short TTL in front of Redis.
+
+    Invalidations are broadcast over Redis pub/sub so every worker drops its local copy.
+    Redis failures degrade to cache misses instead of failing the request.
+    """
+
+    def __init__(
+        self,
+        redis_service: RedisService,
+        local_size: int,
+        local_ttl: int,
+        redis_ttl: int,
+        key_prefix: str = "player:",
+        channel: str = "players:invalidate",
+    ) -> None:
+        self.redis = redis_service.client
+        self.local = TTLCache(maxsize=local_size, ttl=local_ttl, on_evict=lambda _: PLAYER_CACHE_EVICTIONS.inc())
+        self.redis_ttl = redis_ttl
+        self.key_prefix = key_prefix
+        self.channel = channel
+
+    def _key(self, player_id: int) -> str:
+        return f"{self.key_prefix}{player_id}"
+
+    async def get(self, player_id: int) -> Optional[dict]:
+        players = await self.get_many([player_id])
+        return players.get(player_id)
+
+    async def get_many(self, player_ids: List[int]) -> Dict[int, dict]:
+        players, missing = {}, []
+        for player_id in player_ids:
+            player = self.local.get(player_id)
+            if player is None:
+                missing.append(player_id)
+            else:
+                players[player_id] = player
+
+        LOCAL_HITS.inc(len(players))
+        if not missing:
+            return players
+        LOCAL_MISSES.inc(len(missing))
+
+        try:
+            values = await self.redis.mget([self._key(player_id) for player_id in missing])
+        except RedisError as e:
+            logger.warning(f"Player cache read failed: {e}")
+            REDIS_MISSES.inc(len(missing))
+            return players
+
+        hits = 0
+        for player_id, value in zip(missing, values):
+            if value is not None:
+                player = json.loads(value)
+                players[player_id] = player
+                self.local.set(player_id, player)
+                hits += 1
+
+        REDIS_HITS.inc(hits)
+        REDIS_MISSES.inc(len(missing) - hits)
+        return players
+
+    async def set_many(self, players: Iterable[dict]) -> None:
+        pipeline = self.redis.pipeline(transaction=False)
+        for player in players:
+            self.local.set(player["id"], player)
+            pipeline.set(self._key(player["id"]), json.dumps(player), ex=self.redis_ttl)
+
+        try:
+            await pipeline.execute()
+        except RedisError as e:
+            logger.warning(f"Player cache write failed: {e}")
+
+    async def invalidate(self, player_ids: List[int]) -> None:
+        for player_id in player_ids:
+            self.local.pop(player_id)
+
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            pipeline.delete(*[self._key(player_id) for player_id in player_ids])
+            pipeline.publish(self.channel, ",".join(str(player_id) for player_id in player_ids))
+            await pipeline.execute()
+        except RedisError as e:
+            logger.warning(f"Player cache invalidation failed: {e}")
+
+    async def listen(self) -> None:
+        """Drops local entries invalidated by any worker; runs until cancelled."""
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                # messages may have been missed while disconnected
+                self.local.clear()
+                async for message in pubsub.listen():
+                    for player_id in message["data"].split(","):
+                        self.local.pop(int(player_id))
+            except RedisError as e:
+                logger.warning(f"Player cache invalidation listener disconnected: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+
+player_cache_service = PlayerCacheService(
+    RedisService(redis_connection_pool),
+    local_size=settings.PLAYER_CACHE_SIZE,
+    local_ttl=settings.PLAYER_CACHE_LOCAL_TTL,
+    redis_ttl=settings.PLAYER_CACHE_REDIS_TTL,
+)
@@ -0,0 +1,227 @@
+# stdlib
+import asyncio
+import hashlib
+from typing import Iterable, List, Optional, Tuple
+
+# thirdparty
+from prometheus_client import Counter
+from redis.exceptions import RedisError
+from sqlalchemy import text
+
+# project
+import settings
+from db.db_setup import async_read_session, redis_connection_pool
+from services.redis_service import RedisService
+from settings import logger
+
+PLAYER_FILTER_CHECKS = Counter(
+    "player_filter_checks_total",
+    "Total count of player ids checked against the existence filter by result.",
+    ["result"],
+)
+PLAYER_FILTER_FALSE_POSITIVES = Counter(
+    "player_filter_false_positives_total", "Total count of player ids the existence filter let through but not found."
+)
+PLAYER_FILTER_ADD_FAILURES = Counter(
+    "player_filter_add_failures_total", "Total count of player ids that could not be added to the existence filter."
+)
+
+ABSENT = PLAYER_FILTER_CHECKS.labels(result="absent")
+PRESENT = PLAYER_FILTER_CHECKS.labels(result="present")
+UNAVAILABLE = PLAYER_FILTER_CHECKS.labels(result="unavailable")
+
+# seconds between two checks for a lost bitmap, however many reads find it missing
+REBUILD_CHECK_INTERVAL = 10
+
+PLAYER_IDS_PAGE = "SELECT id FROM players WHERE id > CAST(:after_id AS bigint) ORDER BY id LIMIT :limit"
+
+
+class PlayerFilterService:
+    """
+    Bloom filter of the existing player ids in a Redis bitmap, shared by every worker, so ids that match no player
+    are answered without a database query; ids it lets through and the database does not find are remembered for
+    ``negative_ttl`` seconds.
+
+    Bits are set, and the remembered miss dropped, before a player is inserted, so the filter never misses a
+    committed player; a miss read just before the insert and remembered just after it hides the player for at most
+    ``negative_ttl`` seconds, though not from reads pinned to the primary. Until ``rebuild`` has filled the bitmap,
+    and while Redis fails, every id is let through. ``rebuild`` sets the bit after the filter bits, which is read
+    along with them, so a bitmap evicted or deleted, even one recreated since by ``add``, is never trusted; ``run``
+    then rebuilds it. The key holds the size and number of hashes, so changing either starts a new filter. Players
+    are never deleted, so the filter never goes stale; its false positive rate is ``false_positives /
+    (false_positives + absent)``.
+    """
+
+    def __init__(
+        self,
+        redis_service: RedisService,
+        enabled: bool,
+        bits: int,
+        hashes: int,
+        negative_ttl: int,
+        batch_size: int,
+        key_prefix: str = "players:filter",
+    ) -> None:
+        self.redis = redis_service.client
+        self.enabled = enabled
+        self.bits = bits
+        self.hashes = hashes
+        self.negative_ttl = negative_ttl
+        self.batch_size = batch_size
+        self.key = f"{key_prefix}:{bits}:{hashes}"
+        self.rebuild_lock_key = f"{self.key}:rebuild-lock"
+        self.missing_prefix = f"{key_prefix}:missing:"
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def _offsets(self, player_id: int) -> List[int]:
+        # double hashing: k offsets from one 128-bit digest
+        digest = hashlib.blake2b(player_id.to_bytes(8, "big", signed=True), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def _bitfield(self, key: str, player_ids: Iterable[int], operation: str) -> List:
+        """``BITFIELD`` arguments reading or setting the bits of ``player_ids``, all in one command."""
+        args = ["BITFIELD", key]
+        for player_id in player_ids:
+            for offset in self._offsets(player_id):
+                args += ["SET", "u1", offset, 1] if operation == "SET" else ["GET", "u1", offset]
+        return args
+
+    async def candidates(self, player_ids: List[int], remembered: bool = True) -> Tuple[List[int], bool]:
+        """
+        The ids that may belong to a player, the others certainly do not, and whether the filter was checked;
+        pass it on to ``record_missing``. Without ``remembered`` the remembered misses are ignored: a read pinned
+        to the primary must not be answered by a miss a lagging replica read remembered.
+        """
+        if not self.enabled or not player_ids:
+            return player_ids, False
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                # the ready bit comes last
+                pipe.execute_command(*self._bitfield(self.key, player_ids, "GET"), "GET", "u1", self.bits)
+                if remembered:
+                    pipe.mget([f"{self.missing_prefix}{player_id}" for player_id in player_ids])
+                bits, *missing = await pipe.execute()
+            ready = bits.pop()
+            missing = missing[0] if remembered else [None] * len(player_ids)
+        except RedisError as e:
+            logger.warning(f"Player filter check failed: {e}")
+            UNAVAILABLE.inc(len(player_ids))
+            return player_ids, False
+
+        if not ready:
+            UNAVAILABLE.inc(len(player_ids))
+            if self._wakeup is not None:
+                self._wakeup.set()
+            return [player_id for player_id, cached in zip(player_ids, missing) if cached is None], False
+
+        result = []
+        for i, player_id in enumerate(player_ids):
+            if not all(bits[i * self.hashes : (i + 1) * self.hashes]):
+                ABSENT.inc()
+                continue
+            PRESENT.inc()
+            if missing[i] is None:
+                result.append(player_id)
+            else:
+                PLAYER_FILTER_FALSE_POSITIVES.inc()
+        return result, True
+
+    async def record_missing(self, player_ids: List[int], checked: bool) -> None:
+        """Remembers ids let through but not found in the database."""
+        if not self.enabled or not player_ids:
+            return
+
+        if checked:
+            PLAYER_FILTER_FALSE_POSITIVES.inc(len(player_ids))
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for player_id in player_ids:
+                    pipe.set(f"{self.missing_prefix}{player_id}", 1, ex=self.negative_ttl)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Player filter negative cache write failed: {e}")
+
+    async def add(self, player_ids: List[int]) -> None:
+        """Adds ids about to be inserted; a failure is logged, the insert goes ahead."""
+        if not self.enabled or not player_ids:
+            return
+
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.execute_command(*self._bitfield(self.key, player_ids, "SET"))
+                pipe.delete(*[f"{self.missing_prefix}{player_id}" for player_id in player_ids])
+                await pipe.execute()
+        except RedisError as e:
+            # the players are missed until the next rebuild
+            logger.warning(f"Player filter add failed: {e}")
+            PLAYER_FILTER_ADD_FAILURES.inc(len(player_ids))
+
+    async def run(self) -> None:
+        """
+        Builds the filter once per Redis when no worker has yet, and again when reads find the bitmap lost; runs
+        until cancelled.
+        """
+        if not self.enabled:
+            return
+
+        self._wakeup = asyncio.Event()
+        while True:
+            try:
+                if not await self.redis.getbit(self.key, self.bits) and await self.redis.set(
+                    self.rebuild_lock_key, 1, nx=True, ex=300
+                ):
+                    try:
+                        logger.info(f"Player filter rebuilt with {await self.rebuild()} players")
+                    finally:
+                        await self.redis.delete(self.rebuild_lock_key)
+            except Exception as e:
+                logger.warning(f"Player filter rebuild failed: {e}")
+
+            await asyncio.sleep(REBUILD_CHECK_INTERVAL)
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+    async def rebuild(self) -> int:
+        """
+        Fills the filter from ``players.id``; returns the number of players read.
+
+        The bitmap is built under another key and swapped in atomically, merged with the bits added meanwhile.
+        """
+        staging_key = f"{self.key}:rebuild"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(staging_key)
+            # allocated up front, ready bit included
+            pipe.setbit(staging_key, self.bits, 0)
+            await pipe.execute()
+
+        count, after_id = 0, -(2**31) - 1
+        while True:
+            async with async_read_session() as session:
+                result = await session.execute(text(PLAYER_IDS_PAGE), {"after_id": after_id, "limit": self.batch_size})
+                player_ids = result.scalars().all()
+            if not player_ids:
+                break
+
+            await self.redis.execute_command(*self._bitfield(staging_key, player_ids, "SET"))
+            count += len(player_ids)
+            after_id = player_ids[-1]
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.bitop("OR", staging_key, staging_key, self.key)
+            pipe.setbit(staging_key, self.bits, 1)
+            pipe.rename(staging_key, self.key)
+            await pipe.execute()
+
+        return count
+
+
+player_filter_service = PlayerFilterService(
+    RedisService(redis_connection_pool),
+    enabled=settings.PLAYER_FILTER_ENABLED,
+    bits=settings.PLAYER_FILTER_BITS,
+    hashes=settings.PLAYER_FILTER_HASHES,
+    negative_ttl=settings.PLAYER_FILTER_NEGATIVE_TTL,
+    batch_size=settings.PLAYER_FILTER_BATCH_SIZE,
+)
@@ -0,0 +1,215 @@
+# stdlib
+import csv
+import json
+import os
+from enum import Enum
+from typing import BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# thirdparty
+import orjson
+from sqlalchemy import text
+
+# project
+import settings
+from db.db_setup import database
+from services.player_filter_service import player_filter_service
+from services.player_service import PLAYER_ID_MAX
+from settings import logger
+
+USERNAME_MAX_LENGTH = 32
+
+CREATE_STAGING = "CREATE TEMPORARY TABLE IF NOT EXISTS players_import (id integer, username varchar(32))"
+# existing players, matched by id or username, are left as they are
+MERGE = "INSERT INTO players (id, username) SELECT id, username FROM players_import ON CONFLICT DO NOTHING"
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ImportProgress(NamedTuple):
+    """What is done of an import; saved as its checkpoint after every committed batch."""
+
+    source: str
+    size: int
+    offset: int = 0
+    line: int = 0
+    read: int = 0
+    inserted: int = 0
+    rejected: int = 0
+    finished: bool = False
+
+    @classmethod
+    def load(cls, path: str) -> Optional["ImportProgress"]:
+        try:
+            with open(path) as f:
+                return cls(**json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def save(self, path: str) -> None:
+        # replaced in one step, so a crash leaves the previous checkpoint intact
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(self._asdict(), f)
+        os.replace(f"{path}.tmp", path)
+
+
+Record = Tuple[int, str]
+
+
+def validate(player_id, username) -> Tuple[Optional[Record], Optional[str]]:
+    """The row to import, or why it is rejected."""
+    try:
+        if isinstance(player_id, (bool, float)):
+            raise ValueError
+        player_id = int(player_id)
+    except (TypeError, ValueError):
+        return None, "invalid id"
+    if not 0 < player_id <= PLAYER_ID_MAX:
+        return None, "id out of range"
+
+    if not isinstance(username, str) or not username.strip():
+        return None, "missing username"
+    username = username.strip()
+    if len(username) > USERNAME_MAX_LENGTH:
+        return None, "username too long"
+
+    return (player_id, username), None
+
+
+def parse_line(line: bytes, import_format: ImportFormat, header: Optional[List[str]]) -> Tuple[Optional[Record], str]:
+    try:
+        if import_format is ImportFormat.NDJSON:
+            item = orjson.loads(line)
+            if not isinstance(item, dict):
+                return None, "not an object"
+        else:
+            item = dict(zip(header, next(csv.reader([line.decode()]))))
+    except (ValueError, StopIteration):
+        return None, "unparsable"
+
+    return validate(item.get("id"), item.get("username"))
+
+
+def read_batches(
+    f: BinaryIO, import_format: ImportFormat, progress: ImportProgress, batch_size: int
+) -> Iterator[Tuple[List[Record], List[Tuple[int, str]], int, int, int]]:
+    """
+    Validates the rows after ``progress.offset`` and yields them in batches: (rows, rejected line numbers and
+    reasons, rows read, offset and line number after the batch). CSV input has an ``id,username`` header; one row
+    per line.
+    """
+    header = None
+    offset, line_number = progress.offset, progress.line
+    if import_format is ImportFormat.CSV:
+        f.seek(0)
+        first = f.readline()
+        header = [name.strip() for name in next(csv.reader([first.decode()]), [])]
+        if offset == 0:
+            offset, line_number = len(first), 1
+    f.seek(offset)
+
+    read = 0
+    # the last row of a batch wins among duplicate ids
+    rows: Dict[int, str] = {}
+    rejects: List[Tuple[int, str]] = []
+    for line in f:
+        offset += len(line)
+        line_number += 1
+        if not line.strip():
+            continue
+
+        row, reason = parse_line(line, import_format, header)
+        if row is None:
+            rejects.append((line_number, reason))
+        else:
+            rows[row[0]] = row[1]
+        read += 1
+
+        if read >= batch_size:
+            yield list(rows.items()), rejects, read, offset, line_number
+            rows, rejects, read = {}, [], 0
+
+    yield list(rows.items()), rejects, read, offset, line_number
+
+
+async def import_players(
+    path: str,
+    import_format: ImportFormat,
+    checkpoint_path: Optional[str] = None,
+    rejects_path: Optional[str] = None,
+    batch_size: int = settings.IMPORT_BATCH_SIZE,
+    restart: bool = False,
+    on_progress: Optional[Callable[[ImportProgress], None]] = None,
+) -> ImportProgress:
+    """
+    Bulk-loads players from a CSV or NDJSON file, resuming from ``checkpoint_path`` (``<path>.checkpoint``) unless
+    ``restart``; ``database.start()`` must have been called.
+
+    Each batch is copied into a temporary staging table with ``COPY`` and merged into ``players`` with
+    ``INSERT ... ON CONFLICT DO NOTHING`` in one transaction, then the checkpoint is saved. A batch committed
+    just before a crash is merged again on resume, which changes nothing. Rejected rows are appended to
+    ``rejects_path`` with their line number and reason. The ids are added to the player existence filter before
+    each merge.
+    """
+    checkpoint_path = checkpoint_path or f"{path}.checkpoint"
+    source, size = os.path.abspath(path), os.path.getsize(path)
+
+    progress = None if restart else ImportProgress.load(checkpoint_path)
+    if progress is not None and progress.source != source:
+        raise ValueError(f"Checkpoint {checkpoint_path} belongs to {progress.source}")
+    if progress is None:
+        progress = ImportProgress(source=source, size=size)
+    if progress.finished:
+        return progress
+    if progress.offset > size:
+        raise ValueError(f"{path} is shorter than its checkpoint")
+    progress = progress._replace(size=size)
+
+    rejects_file = open(rejects_path, "a") if rejects_path else None
+    try:
+        async with database.engine.connect() as connection:
+            await connection.execute(text(CREATE_STAGING))
+            await connection.commit()
+            driver_connection = (await connection.get_raw_connection()).driver_connection
+
+            with open(path, "rb") as f:
+                for rows, rejects, read, offset, line in read_batches(f, import_format, progress, batch_size):
+                    inserted = 0
+                    if rows:
+                        await player_filter_service.add([player_id for player_id, _ in rows])
+                        # the first statement starts the transaction, which COPY then joins
+                        await connection.execute(text("TRUNCATE players_import"))
+                        await driver_connection.copy_records_to_table(
+                            "players_import", records=rows, columns=("id", "username")
+                        )
+                        result = await connection.execute(text(MERGE))
+                        await connection.commit()
+                        inserted = result.rowcount
+
+                    if rejects_file is not None:
+                        rejects_file.writelines(f"{number}\t{reason}\n" for number, reason in rejects)
+                        rejects_file.flush()
+
+                    progress = progress._replace(
+                        offset=offset,
+                        line=line,
+                        read=progress.read + read,
+                        inserted=progress.inserted + inserted,
+                        rejected=progress.rejected + len(rejects),
+                    )
+                    progress.save(checkpoint_path)
+                    if on_progress is not None:
+                        on_progress(progress)
+    finally:
+        if rejects_file is not None:
+            rejects_file.close()
+
+    progress = progress._replace(finished=True)
+    progress.save(checkpoint_path)
+    logger.info(
+        f"Imported {path}: {progress.read} rows read, {progress.inserted} players inserted, "
+        f"{progress.rejected} rows rejected"
+    )
+    return progress
@@ -0,0 +1,108 @@
+# stdlib
+from enum import Enum
+from typing import Optional
+
+# thirdparty
+from sqlalchemy import and_, func, literal, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# project
+import settings
+from db.models.player_model import PlayerModel
+from utils.cache import TTLCache
+from utils.pagination import decode_cursor, encode_cursor, get_pagination
+
+# pg_trgm cannot use the GIN index for patterns shorter than one trigram
+TRIGRAM_MIN_LENGTH = 3
+
+search_counts = TTLCache(maxsize=1024, ttl=settings.PAGINATION_COUNT_CACHE_TTL)
+
+
+class SearchMode(str, Enum):
+    AUTO = "auto"
+    PREFIX = "prefix"
+    SUBSTRING = "substring"
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def resolve_search_mode(term: str, mode: SearchMode) -> SearchMode:
+    if mode != SearchMode.AUTO:
+        return mode
+    return SearchMode.PREFIX if len(term) < TRIGRAM_MIN_LENGTH else SearchMode.SUBSTRING
+
+
+async def search_players(
+    session: AsyncSession,
+    username: str,
+    page: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    with_count: bool = True,
+    mode: SearchMode = SearchMode.AUTO,
+):
+    """
+    Searches players by username.
+
+    Prefix mode uses the ``lower(username) COLLATE "C"`` btree index and pages in username order.
+    Substring mode uses the ``pg_trgm`` GIN index and ranks matches by trigram similarity.
+    """
+    term = username.strip().lower()
+    mode = resolve_search_mode(term, mode)
+    lower_username = func.lower(PlayerModel.username)
+
+    if mode == SearchMode.PREFIX:
+        sort_key = lower_username.collate("C")
+        # rendered inline: the planner derives the index range of a prefix LIKE only from a constant
+        username_filter = sort_key.like(literal(escape_like(term) + "%", literal_execute=True), escape="\\")
+        order_by = (sort_key, PlayerModel.id)
+        cursor_types = (str, int)
+    else:
+        sort_key = func.similarity(lower_username, literal(term))
+        username_filter = lower_username.like("%" + escape_like(term) + "%", escape="\\")
+        order_by = (sort_key.desc(), PlayerModel.id)
+        cursor_types = (float, int)
+
+    count_query = select(func.count(PlayerModel.id)).filter(username_filter)
+    query = select(PlayerModel, sort_key).filter(username_filter).order_by(*order_by).limit(limit + 1)
+
+    if cursor:
+        after_key, after_id = decode_cursor(cursor, *cursor_types)
+        if mode == SearchMode.PREFIX:
+            query = query.filter(tuple_(sort_key, PlayerModel.id) > (after_key, after_id))
+        else:
+            query = query.filter(or_(sort_key < after_key, and_(sort_key == after_key, PlayerModel.id > after_id)))
+        page = None
+    else:
+        query = query.offset((page - 1) * limit)
+
+    count_key = (mode, term)
+    total_count = search_counts.get(count_key) if with_count else None
+    count_in_query = with_count and total_count is None
+
+    if count_in_query:
+        query = query.add_columns(count_query.correlate(None).scalar_subquery())
+
+    result = await session.execute(query)
+    rows = result.all()
+
+    if count_in_query:
+        if rows:
+            total_count = rows[0][2]
+        elif cursor or page > 1:
+            total_count = await session.scalar(count_query)
+        else:
+            total_count = 0
+        search_counts.set(count_key, total_count)
+
+    players = [row[0] for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last[1], last[0].id)
+
+    pagination = get_pagination(page=page, limit=limit, count=total_count, next_cursor=next_cursor)
+
+    return players, pagination
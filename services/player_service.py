@@ -1,14 +1,37 @@
 # stdlib
-from typing import List
+from bisect import bisect_right
+from typing import AsyncIterator, Dict, List, Optional
 
 # thirdparty
-from sqlalchemy import func, select, text
+import orjson
+from sqlalchemy import any_, select, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # project
+import settings
+from db.db_setup import async_read_session, async_session
 from db.models.player_model import PlayerModel
-from db.schemas.player_schema import PlayerCreate
-from utils.pagination import get_pagination
+from db.schemas.player_schema import PlayerCreate, PlayerSchema
+from services.player_cache_service import player_cache_service
+from services.player_filter_service import player_filter_service
+from utils.dataloader import BatchWriter, DataLoader
+from utils.errors import ErrorResponseEnum
+from utils.helpers import CustomHTTPException
+from utils.pagination import decode_cursor, encode_cursor, get_pagination
+
+PLAYERS_BY_IDS = "SELECT id, username, created_at, updated_at FROM players WHERE id = ANY(:ids) ORDER BY id"
+# the range of ``players.id``; other ids cannot exist
+PLAYER_ID_MIN, PLAYER_ID_MAX = -(2**31), 2**31 - 1
+
+
+def in_player_id_range(player_id: int) -> bool:
+    """Whether ``players.id`` can hold ``player_id``; a row it cannot fails the whole write batch it joins."""
+    return PLAYER_ID_MIN <= player_id <= PLAYER_ID_MAX
+
+
+def serialize_player(player) -> dict:
+    return PlayerSchema.model_validate(player, from_attributes=True).model_dump(mode="json")
 
 
 async def get_player_by_username(session: AsyncSession, username: str):
@@ -17,72 +40,185 @@ async def get_player_by_username(session: AsyncSession, username: str):
     return result.scalar_one_or_none()
 
 
-async def create_or_get_player(session: AsyncSession, player: PlayerCreate):
+async def upsert_players(players: Dict[int, PlayerCreate]) -> Dict[int, dict]:
+    player_ids = list(players)
     query = """
-            WITH new_player AS (
-                INSERT INTO players (
-                    id, username
-                )
-                VALUES (
-                    :id,
-                    :username
-                )
-                ON CONFLICT (id) DO NOTHING
-                RETURNING *
+            INSERT INTO players (
+                id, username
             )
-            SELECT * FROM new_player
-            UNION
-            SELECT * FROM players WHERE id = :id;
+            SELECT * FROM unnest(CAST(:ids AS integer[]), CAST(:usernames AS varchar[]))
+            ON CONFLICT DO NOTHING
+            RETURNING id;
         """
 
-    result = await session.execute(text(query), {"id": player.player_id, "username": player.username})
-    player = result.mappings().first()
-    return player
+    # before the insert, so the filter knows every committed player
+    await player_filter_service.add(player_ids)
 
+    async with async_session.begin() as session:
+        result = await session.execute(
+            text(query), {"ids": player_ids, "usernames": [players[player_id].username for player_id in player_ids]}
+        )
+        inserted_ids = result.scalars().all()
 
-async def get_player(session: AsyncSession, player_id: int):
-    query = select(PlayerModel).filter(PlayerModel.id == player_id)  # noqa
-    result = await session.execute(query)
-    return result.scalar_one_or_none()
+        result = await session.execute(select(PlayerModel).filter(PlayerModel.id == any_(player_ids)))  # noqa
+        rows = [serialize_player(player) for player in result.scalars().all()]
+
+    if inserted_ids:
+        await player_cache_service.invalidate(inserted_ids)
+    await player_cache_service.set_many(rows)
+
+    return {player["id"]: player for player in rows}
 
 
-async def get_players_by_ids(session: AsyncSession, player_ids: List[int], page: int, limit: int):
-    query = select(PlayerModel).filter(PlayerModel.id.in_(player_ids)).offset((page - 1) * limit).limit(limit)  # noqa
+def is_row_error(e: Exception) -> bool:
+    """
+    Whether the database rejected the values of a row: a data exception or an integrity constraint violation.
 
-    count_query = select(func.count(PlayerModel.id)).filter(PlayerModel.id.in_(player_ids))  # noqa
+    The rest of a batch failing with such an error is written without the row; other errors fail the batch.
+    """
+    return isinstance(e, DBAPIError) and str(getattr(e.orig, "sqlstate", "")).startswith(("22", "23"))
 
+
+player_writer = BatchWriter(
+    upsert_players,
+    delay=settings.PLAYER_WRITER_DELAY_MS / 1000,
+    max_batch_size=settings.PLAYER_WRITER_MAX_BATCH_SIZE,
+    split_on=is_row_error,
+)
+
+
+async def create_or_get_player(player: PlayerCreate) -> Optional[dict]:
+    """
+    Returns the existing player or creates it; ``None`` when the row could not be inserted (username taken).
+
+    Existing players are served from the cache, since an existing row is never updated here; concurrent
+    calls are written in one multi-row ``INSERT ... ON CONFLICT DO NOTHING`` per batch. Ids ``players.id``
+    cannot hold are rejected before they join a batch.
+    """
+    if not in_player_id_range(player.player_id):
+        raise CustomHTTPException(error_response=ErrorResponseEnum.PLAYER_ID_OUT_OF_RANGE)
+
+    cached = await player_cache_service.get(player.player_id)
+    if cached is not None:
+        return cached
+
+    return await player_writer.write(player.player_id, player)
+
+
+async def select_players(session: AsyncSession, player_ids: List[int]) -> List[dict]:
+    query = select(PlayerModel).filter(PlayerModel.id.in_(player_ids))  # noqa
     result = await session.execute(query)
-    results = await session.execute(count_query)
+    return [serialize_player(player) for player in result.scalars().all()]
+
+
+async def load_players(player_ids: List[int]) -> Dict[int, dict]:
+    async with async_read_session() as session:
+        players = await select_players(session, player_ids)
 
-    players = result.scalars().all()
-    total_count = results.scalar()
+    await player_cache_service.set_many(players)
 
-    pagination = get_pagination(page=page, limit=limit, count=total_count)
+    return {player["id"]: player for player in players}
 
-    return players, pagination
 
+player_loader = DataLoader(
+    load_players, delay=settings.PLAYER_LOADER_DELAY_MS / 1000, max_batch_size=settings.PLAYER_LOADER_MAX_BATCH_SIZE
+)
 
-async def get_players_by_username(session: AsyncSession, username: str, page: int, limit: int):
-    query = (
-        select(PlayerModel)
-        .filter(func.lower(PlayerModel.username).ilike("%" + username + "%"))
-        .offset((page - 1) * limit)
-        .limit(limit)
+
+async def fetch_players(session: AsyncSession, player_ids: List[int]) -> Dict[int, dict]:
+    """
+    Reads uncached players through the replica-backed loader, or directly from ``session``
+    when it is pinned to the primary after a write of the requesting player.
+
+    Ids the existence filter rules out are not queried.
+    """
+    primary = session.info.get("primary", False)
+    player_ids, checked = await player_filter_service.candidates(
+        [player_id for player_id in player_ids if in_player_id_range(player_id)], remembered=not primary
     )
+    if not player_ids:
+        return {}
+
+    if primary:
+        players = {player["id"]: player for player in await select_players(session, player_ids)}
+    else:
+        loaded = await player_loader.load_many(player_ids)
+        players = {player["id"]: player for player in loaded if player is not None}
 
-    count_query = select(func.count(PlayerModel.id)).filter(
-        func.lower(PlayerModel.username).ilike("%" + username + "%")
+    await player_filter_service.record_missing(
+        [player_id for player_id in player_ids if player_id not in players], checked
     )
+    return players
 
-    result = await session.execute(query)
-    results = await session.execute(count_query)
 
-    players = result.scalars().all()
-    total_count = results.scalar()
+async def get_player(session: AsyncSession, player_id: int) -> Optional[dict]:
+    player = await player_cache_service.get(player_id)
+    if player is not None:
+        return player
+
+    players = await fetch_players(session, [player_id])
+    return players.get(player_id)
+
+
+async def get_players_by_ids(
+    session: AsyncSession, player_ids: List[int], page: int, limit: int, cursor: Optional[str] = None
+):
+    player_ids = sorted(set(player_ids))
+    players = await player_cache_service.get_many(player_ids)
+
+    missing = [player_id for player_id in player_ids if player_id not in players]
+    if missing:
+        players.update(await fetch_players(session, missing))
+
+    found = [players[player_id] for player_id in player_ids if player_id in players]
+
+    if cursor:
+        (after_id,) = decode_cursor(cursor, int)
+        start = bisect_right(found, after_id, key=lambda player: player["id"])
+        page = None
+    else:
+        start = (page - 1) * limit
+
+    results = found[start : start + limit]
+    next_cursor = encode_cursor(results[-1]["id"]) if start + limit < len(found) else None
+
+    pagination = get_pagination(page=page, limit=limit, count=len(found), next_cursor=next_cursor)
+
+    return results, pagination
+
+
+async def stream_players(player_ids: List[int], chunk_size: int) -> AsyncIterator[bytes]:
+    """
+    NDJSON lines: ``{"player": ...}`` for every player found, in id order, ``{"missing": [...]}`` for the ids of
+    each chunk that match no player, and last ``{"summary": {"found": n, "missing": n}}``; a stream without the
+    summary was cut short.
+
+    Ids are read ``chunk_size`` at a time, each chunk written out before the next query, so memory does not grow
+    with the number of ids. Sessions are opened here: the response is streamed after the endpoint returns.
+    """
+    player_ids = sorted(set(player_ids))
+    found = missing = 0
+
+    for start in range(0, len(player_ids), chunk_size):
+        chunk = player_ids[start : start + chunk_size]
+        async with async_read_session() as session:
+            result = await session.execute(
+                text(PLAYERS_BY_IDS),
+                {"ids": [player_id for player_id in chunk if in_player_id_range(player_id)]},
+            )
+            rows = result.mappings().all()
+
+        lines = [orjson.dumps({"player": dict(row)}) for row in rows]
+        if len(rows) < len(chunk):
+            found_ids = {row["id"] for row in rows}
+            missing_ids = [player_id for player_id in chunk if player_id not in found_ids]
+            lines.append(orjson.dumps({"missing": missing_ids}))
+            missing += len(missing_ids)
+        found += len(rows)
 
-    pagination = get_pagination(page=page, limit=limit, count=total_count)
+        yield b"\n".join(lines) + b"\n"
 
-    return players, pagination
+    yield orjson.dumps({"summary": {"found": found, "missing": missing}}) + b"\n"
 
 
 async def get_player_by_id(session: AsyncSession, player_id: int):
@@ -0,0 +1,157 @@
+# stdlib
+import math
+import time
+from typing import List, Tuple
+
+# thirdparty
+from fastapi import Request
+from prometheus_client import Counter
+from redis.exceptions import RedisError
+
+# project
+import settings
+from db.db_setup import redis_connection_pool
+from services.redis_service import RedisService
+from settings import logger
+from utils.cache import TTLCache
+from utils.errors import ErrorResponseEnum
+from utils.helpers import CustomHTTPException
+
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total",
+    "Total count of rate limited requests by route, key type and the tier that rejected them.",
+    ["route", "key_type", "tier"],
+)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+# A token bucket per KEYS[i], refilled at ARGV[2i - 1] tokens per millisecond up to ARGV[2i] tokens. A token is
+# taken from every bucket only when each of them has one. Returns {0, 0} when allowed, otherwise the milliseconds
+# until the emptiest bucket has a token again and its index. Redis time keeps all workers on the same clock.
+TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local retry_after, blocked = 0, 0
+local tokens = {}
+for i, key in ipairs(KEYS) do
+    local rate, capacity = tonumber(ARGV[i * 2 - 1]), tonumber(ARGV[i * 2])
+    local bucket = redis.call('HMGET', key, 'tokens', 'updated_at')
+    local available = tonumber(bucket[1]) or capacity
+    local updated_at = tonumber(bucket[2]) or now
+    available = math.min(capacity, available + math.max(0, now - updated_at) * rate)
+    if available < 1 then
+        local wait = math.ceil((1 - available) / rate)
+        if wait > retry_after then
+            retry_after, blocked = wait, i
+        end
+    end
+    tokens[i] = available
+end
+for i, key in ipairs(KEYS) do
+    local rate, capacity = tonumber(ARGV[i * 2 - 1]), tonumber(ARGV[i * 2])
+    if retry_after == 0 then
+        tokens[i] = tokens[i] - 1
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens[i]), 'updated_at', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate))
+end
+return {retry_after, blocked}
+"""
+
+
+def parse_limit(limit: str) -> Tuple[int, int]:
+    """Parses ``"<count>/<period>"`` into the count and the period in seconds."""
+    count, _, period = limit.partition("/")
+    return int(count), PERIODS[period.strip()]
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter shared by all workers through an atomic Redis script.
+
+    Keys found over budget are remembered in-process until they have a token again, so a client hammering
+    a route is rejected without a Redis round trip. Redis failures let requests through.
+    """
+
+    def __init__(self, redis_service: RedisService, local_size: int, key_prefix: str = "ratelimit:") -> None:
+        self.redis = redis_service.client
+        self.script = self.redis.register_script(TOKEN_BUCKET_SCRIPT)
+        self.blocked = TTLCache(maxsize=local_size, ttl=PERIODS["hour"])
+        self.key_prefix = key_prefix
+
+    async def hit(self, buckets: List[Tuple[str, int, int]]) -> Tuple[float, int, str]:
+        """
+        Takes a token from every ``(key, count, period)`` bucket.
+
+        Returns the seconds until the request would be allowed (0 when it is), the index of the exhausted
+        bucket and the tier which decided.
+        """
+        now = time.monotonic()
+        for index, (key, _, _) in enumerate(buckets):
+            blocked_until = self.blocked.get(key)
+            if blocked_until is not None:
+                return blocked_until - now, index, "local"
+
+        args = []
+        for _, count, period in buckets:
+            args += [count / (period * 1000), count]
+
+        try:
+            retry_after_ms, blocked = await self.script(
+                keys=[self.key_prefix + key for key, _, _ in buckets], args=args
+            )
+        except RedisError as e:
+            logger.warning(f"Rate limiter unavailable: {e}")
+            return 0, 0, "redis"
+
+        if not retry_after_ms:
+            return 0, 0, "redis"
+
+        retry_after = retry_after_ms / 1000
+        index = blocked - 1
+        self.blocked.set(buckets[index][0], now + retry_after, ttl=retry_after)
+        return retry_after, index, "redis"
+
+
+rate_limiter = RateLimiter(RedisService(redis_connection_pool), local_size=settings.RATE_LIMIT_LOCAL_SIZE)
+
+
+class RateLimit:
+    """
+    Route dependency limiting requests per verified player and per client IP.
+
+    ``limit`` is ``"<count>/<second|minute|hour>"``; the IP budget is ``ip_factor`` times larger, since many
+    players may share one address. Anonymous requests are only limited by IP.
+    """
+
+    def __init__(self, route: str, limit: str, ip_factor: int = settings.RATE_LIMIT_IP_FACTOR) -> None:
+        self.route = route
+        self.count, self.period = parse_limit(limit)
+        self.ip_count = self.count * ip_factor
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        buckets, key_types = [], []
+
+        player = request.scope.get("state", {}).get("player")
+        if player is not None:
+            buckets.append((f"{self.route}:player:{player.id}", self.count, self.period))
+            key_types.append("player")
+
+        if request.client is not None:
+            buckets.append((f"{self.route}:ip:{request.client.host}", self.ip_count, self.period))
+            key_types.append("ip")
+
+        if not buckets:
+            return
+
+        retry_after, index, tier = await rate_limiter.hit(buckets)
+
+        if retry_after > 0:
+            RATE_LIMIT_REJECTIONS.labels(route=self.route, key_type=key_types[index], tier=tier).inc()
+            raise CustomHTTPException(
+                error_response=ErrorResponseEnum.TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
@@ -1,44 +1,118 @@
 # stdlib
 import logging
 import os
+import re
 import time
-from typing import Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Pattern, Tuple
 
 # thirdparty
 from dotenv import load_dotenv
 from opentelemetry import trace
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
-from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from opentelemetry.instrumentation.logging import LoggingInstrumentor
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
 from prometheus_client.openmetrics.exposition import CONTENT_TYPE_LATEST, generate_latest
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import Request
 from starlette.responses import Response
-from starlette.routing import Match
+from starlette.routing import WebSocketRoute
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# project
+from utils.cache import TTLCache
+
+if TYPE_CHECKING:
+    # thirdparty
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SpanExporter
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_JSON = os.getenv("LOG_JSON", "True") == "True"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
 TRACEBACK_OUTPUT_ENABLED = os.getenv("TRACEBACK_OUTPUT_ENABLED", "False") == "True"
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 DATABASE_URL_PSYCOPG2 = os.getenv("DATABASE_URL_PSYCOPG2")
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
 
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6389))
 
+PLAYER_CACHE_SIZE = int(os.getenv("PLAYER_CACHE_SIZE", 10000))
+PLAYER_CACHE_LOCAL_TTL = int(os.getenv("PLAYER_CACHE_LOCAL_TTL", 30))
+PLAYER_CACHE_REDIS_TTL = int(os.getenv("PLAYER_CACHE_REDIS_TTL", 300))
+
+# Bloom filter of the player ids in Redis; 2**26 bits (8 MiB) and 7 hashes stay near 1% false positives up to 7M ids
+PLAYER_FILTER_ENABLED = os.getenv("PLAYER_FILTER_ENABLED", "True") == "True"
+PLAYER_FILTER_BITS = int(os.getenv("PLAYER_FILTER_BITS", 2**26))
+PLAYER_FILTER_HASHES = int(os.getenv("PLAYER_FILTER_HASHES", 7))
+PLAYER_FILTER_NEGATIVE_TTL = int(os.getenv("PLAYER_FILTER_NEGATIVE_TTL", 30))
+PLAYER_FILTER_BATCH_SIZE = int(os.getenv("PLAYER_FILTER_BATCH_SIZE", 10000))
+
 ASYNC_ENGINE_POOL_SIZE = int(os.getenv("ASYNC_ENGINE_POOL_SIZE", 20))
 ASYNC_ENGINE_MAX_OVERFLOW = int(os.getenv("ASYNC_ENGINE_MAX_OVERFLOW", 50))
+ASYNC_REPLICA_ENGINE_POOL_SIZE = int(os.getenv("ASYNC_REPLICA_ENGINE_POOL_SIZE", 20))
+ASYNC_REPLICA_ENGINE_MAX_OVERFLOW = int(os.getenv("ASYNC_REPLICA_ENGINE_MAX_OVERFLOW", 50))
+
+READ_YOUR_WRITES_TTL = int(os.getenv("READ_YOUR_WRITES_TTL", 5))
+
+# share of a pool's connections in use at which /health/ready reports the worker as not ready
+HEALTH_POOL_SATURATION = float(os.getenv("HEALTH_POOL_SATURATION", 0.9))
+
+# limits are "<count>/<second|minute|hour>"; the per-IP budget is RATE_LIMIT_IP_FACTOR times the per-player one
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "True") == "True"
+RATE_LIMIT_PLAYERS_READ = os.getenv("RATE_LIMIT_PLAYERS_READ", "120/minute")
+RATE_LIMIT_PLAYERS_WRITE = os.getenv("RATE_LIMIT_PLAYERS_WRITE", "20/minute")
+RATE_LIMIT_PLAYERS_SEARCH = os.getenv("RATE_LIMIT_PLAYERS_SEARCH", "30/minute")
+RATE_LIMIT_PLAYERS_LOOKUP = os.getenv("RATE_LIMIT_PLAYERS_LOOKUP", "10/minute")
+RATE_LIMIT_IP_FACTOR = int(os.getenv("RATE_LIMIT_IP_FACTOR", 5))
+RATE_LIMIT_LOCAL_SIZE = int(os.getenv("RATE_LIMIT_LOCAL_SIZE", 10000))
+
+# scores live in a Redis sorted set and are copied to players.score every LEADERBOARD_SYNC_INTERVAL seconds
+LEADERBOARD_SYNC_INTERVAL = float(os.getenv("LEADERBOARD_SYNC_INTERVAL", 5))
+LEADERBOARD_SYNC_BATCH_SIZE = int(os.getenv("LEADERBOARD_SYNC_BATCH_SIZE", 1000))
+LEADERBOARD_MAX_RADIUS = int(os.getenv("LEADERBOARD_MAX_RADIUS", 50))
+
+# Cache-Control of the player routes; conditional requests within a max-age are answered from remembered ETags
+PLAYERS_CACHE_CONTROL = os.getenv("PLAYERS_CACHE_CONTROL", "private, no-cache")
+PLAYERS_SEARCH_CACHE_CONTROL = os.getenv("PLAYERS_SEARCH_CACHE_CONTROL", "private, max-age=10")
+HTTP_VALIDATOR_CACHE_SIZE = int(os.getenv("HTTP_VALIDATOR_CACHE_SIZE", 10000))
+
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", 1000))
+GZIP_COMPRESS_LEVEL = int(os.getenv("GZIP_COMPRESS_LEVEL", 6))
+
+PAGINATION_DEFAULT_LIMIT = int(os.getenv("PAGINATION_DEFAULT_LIMIT", 20))
+PAGINATION_MAX_LIMIT = int(os.getenv("PAGINATION_MAX_LIMIT", 100))
+PAGINATION_COUNT_CACHE_TTL = int(os.getenv("PAGINATION_COUNT_CACHE_TTL", 30))
+
+PLAYER_LOADER_DELAY_MS = float(os.getenv("PLAYER_LOADER_DELAY_MS", 0))
+PLAYER_LOADER_MAX_BATCH_SIZE = int(os.getenv("PLAYER_LOADER_MAX_BATCH_SIZE", 1000))
+PLAYERS_LOOKUP_MAX_IDS = int(os.getenv("PLAYERS_LOOKUP_MAX_IDS", 100000))
+PLAYERS_LOOKUP_CHUNK_SIZE = int(os.getenv("PLAYERS_LOOKUP_CHUNK_SIZE", 1000))
+
+# the admin routes are disabled while the token is unset
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN", "")
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 10000))
+
+PLAYER_WRITER_DELAY_MS = float(os.getenv("PLAYER_WRITER_DELAY_MS", 2))
+PLAYER_WRITER_MAX_BATCH_SIZE = int(os.getenv("PLAYER_WRITER_MAX_BATCH_SIZE", 500))
+
+# activity of authenticated players is buffered per worker and written every PLAYER_ACTIVITY_FLUSH_INTERVAL seconds,
+# or as soon as PLAYER_ACTIVITY_MAX_PENDING players are buffered
+PLAYER_ACTIVITY_ENABLED = os.getenv("PLAYER_ACTIVITY_ENABLED", "True") == "True"
+PLAYER_ACTIVITY_FLUSH_INTERVAL = float(os.getenv("PLAYER_ACTIVITY_FLUSH_INTERVAL", 10))
+PLAYER_ACTIVITY_BATCH_SIZE = int(os.getenv("PLAYER_ACTIVITY_BATCH_SIZE", 1000))
+PLAYER_ACTIVITY_MAX_PENDING = int(os.getenv("PLAYER_ACTIVITY_MAX_PENDING", 10000))
 
 BOT_LINK = os.getenv("BOT_LINK", "")
 BOT_TOKEN = os.getenv("BOT_TOKEN", "")
 
+INIT_DATA_MAX_AGE = int(os.getenv("INIT_DATA_MAX_AGE", 86400))
+INIT_DATA_CACHE_SIZE = int(os.getenv("INIT_DATA_CACHE_SIZE", 10000))
+INIT_DATA_CACHE_TTL = int(os.getenv("INIT_DATA_CACHE_TTL", 300))
+
 RABBITMQ = {
     "PROTOCOL": "amqp",
     "HOST": os.getenv("RABBITMQ_HOST", "localhost"),
@@ -50,10 +124,23 @@ RABBITMQ = {
 CELERY_BROKER_URL = (
     f"{RABBITMQ['PROTOCOL']}://{RABBITMQ['USER']}:{RABBITMQ['PASSWORD']}@{RABBITMQ['HOST']}:{RABBITMQ['PORT']}"
 )
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", f"redis://{REDIS_HOST}:{REDIS_PORT}/1")
 
+# set empty to disable tracing, with no instrumentation at all
 OTLP_GRPC_ENDPOINT = os.getenv("OTLP_GRPC_ENDPOINT", "http://localhost:4317")
+OTLP_FLUSH_TIMEOUT_MS = int(os.getenv("OTLP_FLUSH_TIMEOUT_MS", 5000))
+OTLP_EXPORT_TIMEOUT_MS = int(os.getenv("OTLP_EXPORT_TIMEOUT_MS", 10000))
+OTLP_MAX_QUEUE_SIZE = int(os.getenv("OTLP_MAX_QUEUE_SIZE", 2048))
+OTLP_MAX_EXPORT_BATCH_SIZE = int(os.getenv("OTLP_MAX_EXPORT_BATCH_SIZE", 512))
+OTLP_SCHEDULE_DELAY_MS = int(os.getenv("OTLP_SCHEDULE_DELAY_MS", 5000))
+TRACING_ENABLED = bool(OTLP_GRPC_ENDPOINT)
+TRACING_SAMPLE_RATIO = float(os.getenv("TRACING_SAMPLE_RATIO", 1.0))
+TRACING_KEEP_ERRORS = os.getenv("TRACING_KEEP_ERRORS", "True") == "True"
+TRACING_SLOW_THRESHOLD_MS = float(os.getenv("TRACING_SLOW_THRESHOLD_MS", 1000))
+TRACING_LOG_CORRELATION = os.getenv("TRACING_LOG_CORRELATION", "True") == "True"
 
-INFO = Gauge("fastapi_app_info", "FastAPI application information.", ["app_name"])
+# the multiprocess modes only apply when PROMETHEUS_MULTIPROC_DIR is set (see gunicorn.conf.py)
+INFO = Gauge("fastapi_app_info", "FastAPI application information.", ["app_name"], multiprocess_mode="max")
 REQUESTS = Counter(
     "fastapi_requests_total", "Total count of requests by method and path.", ["method", "path", "app_name"]
 )
@@ -76,69 +163,222 @@ REQUESTS_IN_PROGRESS = Gauge(
     "fastapi_requests_in_progress",
     "Gauge of requests by method and path currently being processed",
     ["method", "path", "app_name"],
+    multiprocess_mode="livesum",
 )
 
+_NAMED_GROUP = re.compile(r"\(\?P<\w+>")
+_UNRESOLVED = object()
+
+
+class RouteTemplateResolver:
+    """
+    Resolves request paths to route templates.
+
+    Route patterns are merged into a single compiled regex per HTTP method, so resolving a path costs one
+    ``re.match`` regardless of the number of routes; resolved paths are additionally kept in a bounded cache.
+    The first route matching both path and method wins, as in ``Router``.
+    """
+
+    def __init__(self, cache_size: int = 1024) -> None:
+        self._routes_count = -1
+        self._matchers: Dict[str, Tuple[Optional[Pattern], List[str]]] = {}
+        self._cache = TTLCache(maxsize=cache_size, ttl=float("inf"))
+
+    def resolve(self, scope: Scope) -> Optional[str]:
+        routes = scope["app"].routes
+        if len(routes) != self._routes_count:
+            self._routes_count = len(routes)
+            self._matchers.clear()
+            self._cache.clear()
+
+        method = scope["method"]
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path) :]
+
+        key = (method, path)
+        template = self._cache.get(key, _UNRESOLVED)
+        if template is not _UNRESOLVED:
+            return template
+
+        matcher = self._matchers.get(method)
+        if matcher is None:
+            matcher = self._matchers[method] = self._compile(routes, method)
+
+        pattern, templates = matcher
+        match = pattern.match(path) if pattern is not None else None
+        template = templates[int(match.lastgroup[1:])] if match else None
+
+        self._cache.set(key, template)
+        return template
 
-class PrometheusMiddleware(BaseHTTPMiddleware):
+    @staticmethod
+    def _compile(routes: list, method: str) -> Tuple[Optional[Pattern], List[str]]:
+        patterns, templates = [], []
+        for route in routes:
+            path_regex = getattr(route, "path_regex", None)
+            if path_regex is None or isinstance(route, WebSocketRoute):
+                continue
+
+            methods = getattr(route, "methods", None)
+            if methods is not None and method not in methods:
+                continue
+
+            pattern = _NAMED_GROUP.sub("(?:", path_regex.pattern).removeprefix("^").removesuffix("$")
+            patterns.append(f"(?P<r{len(templates)}>{pattern})")
+            templates.append(route.path)
+
+        if not patterns:
+            return None, templates
+
+        return re.compile("^(?:" + "|".join(patterns) + ")$"), templates
+
+
+class PrometheusMiddleware:
     def __init__(self, app: ASGIApp, app_name: str = "mini-app-api") -> None:
-        super().__init__(app)
+        self.app = app
         self.app_name = app_name
+        self.resolver = RouteTemplateResolver()
+        self._children: Dict[Tuple[str, str], tuple] = {}
+        self._responses: Dict[Tuple[str, str, int], Counter] = {}
         INFO.labels(app_name=self.app_name).inc()
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        method = request.method
-        path, is_handled_path = self.get_path(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        if not is_handled_path:
-            return await call_next(request)
+        method = scope["method"]
+        path = self.resolver.resolve(scope)
 
-        REQUESTS_IN_PROGRESS.labels(method=method, path=path, app_name=self.app_name).inc()
-        REQUESTS.labels(method=method, path=path, app_name=self.app_name).inc()
+        if path is None:
+            await self.app(scope, receive, send)
+            return
+
+        requests, requests_in_progress, requests_processing_time = self._get_children(method, path)
+
+        status_code = HTTP_500_INTERNAL_SERVER_ERROR
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        requests_in_progress.inc()
+        requests.inc()
         before_time = time.perf_counter()
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except BaseException as e:
             status_code = HTTP_500_INTERNAL_SERVER_ERROR
             EXCEPTIONS.labels(method=method, path=path, exception_type=type(e).__name__, app_name=self.app_name).inc()
             raise e from None
         else:
-            status_code = response.status_code
             after_time = time.perf_counter()
-            span = trace.get_current_span()
-            trace_id = trace.format_trace_id(span.get_span_context().trace_id)
+            span_context = trace.get_current_span().get_span_context()
+            # only sampled traces reach Tempo
+            if span_context.trace_flags.sampled:
+                exemplar = {"TraceID": trace.format_trace_id(span_context.trace_id)}
+            else:
+                exemplar = None
 
-            REQUESTS_PROCESSING_TIME.labels(method=method, path=path, app_name=self.app_name).observe(
-                after_time - before_time, exemplar={"TraceID": trace_id}
-            )
+            requests_processing_time.observe(after_time - before_time, exemplar=exemplar)
         finally:
-            RESPONSES.labels(method=method, path=path, status_code=status_code, app_name=self.app_name).inc()
-            REQUESTS_IN_PROGRESS.labels(method=method, path=path, app_name=self.app_name).dec()
-
-        return response
+            self._get_responses(method, path, status_code).inc()
+            requests_in_progress.dec()
 
-    @staticmethod
-    def get_path(request: Request) -> Tuple[str, bool]:
-        for route in request.app.routes:
-            match, _ = route.matches(request.scope)
-            if match == Match.FULL:
-                return route.path, True
+    def _get_children(self, method: str, path: str) -> tuple:
+        children = self._children.get((method, path))
+        if children is None:
+            labels = dict(method=method, path=path, app_name=self.app_name)
+            children = self._children[(method, path)] = (
+                REQUESTS.labels(**labels),
+                REQUESTS_IN_PROGRESS.labels(**labels),
+                REQUESTS_PROCESSING_TIME.labels(**labels),
+            )
+        return children
 
-        return request.url.path, False
+    def _get_responses(self, method: str, path: str, status_code: int) -> Counter:
+        child = self._responses.get((method, path, status_code))
+        if child is None:
+            child = self._responses[(method, path, status_code)] = RESPONSES.labels(
+                method=method, path=path, status_code=status_code, app_name=self.app_name
+            )
+        return child
 
 
 def metrics(request: Request) -> Response:
-    return Response(generate_latest(REGISTRY), headers={"Content-Type": CONTENT_TYPE_LATEST})
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # aggregate the metric files of every worker, not just the one serving this request
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+
+    return Response(generate_latest(registry), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
+def setting_instrumentation(app: ASGIApp) -> None:
+    """
+    Instruments the app when it is created; spans go to the global tracer provider, which ``setting_otlp``
+    installs later in each worker process.
+    """
+    # the OpenTelemetry packages take a noticeable share of the startup time, so they are imported when used
+    # thirdparty
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+    FastAPIInstrumentor.instrument_app(app)
+
+
+def setting_otlp(
+    app_name: str, endpoint: str, span_exporter: Optional["SpanExporter"] = None
+) -> Optional["TracerProvider"]:
+    """
+    Sets up the tracer provider and exporter of this process; called from the lifespan, so every worker
+    gets its own export thread and gRPC channel after the fork. ``span_exporter`` replaces the OTLP exporter.
+
+    Returns ``None`` and leaves the no-op provider in place when there is neither an endpoint nor an exporter.
+    ``TRACING_SAMPLE_RATIO`` of the traces are sampled; failed and slow requests are kept too, see
+    ``utils.tracing``.
+    """
+    if not endpoint and span_exporter is None:
+        return None
+
+    # thirdparty
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+
+    # project
+    from utils.tracing import KeepSpanProcessor, build_sampler
 
+    tracer = trace.get_tracer_provider()
+    if isinstance(tracer, TracerProvider):
+        return tracer
 
-def setting_otlp(app: ASGIApp, app_name: str, endpoint: str, log_correlation: bool = True) -> None:
     resource = Resource.create(attributes={"service.name": app_name, "compose_service": app_name})
+    sampler = build_sampler(TRACING_SAMPLE_RATIO, TRACING_KEEP_ERRORS, TRACING_SLOW_THRESHOLD_MS)
 
-    tracer = TracerProvider(resource=resource)
+    # flushed with a deadline by the lifespan instead: an unreachable collector would block exit for minutes
+    tracer = TracerProvider(resource=resource, sampler=sampler, shutdown_on_exit=False)
     trace.set_tracer_provider(tracer)
 
-    tracer.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+    if span_exporter is None:
+        # thirdparty
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 
-    if log_correlation:
-        LoggingInstrumentor().instrument(set_logging_format=True)
+        span_exporter = OTLPSpanExporter(endpoint=endpoint, timeout=OTLP_EXPORT_TIMEOUT_MS / 1000)
+    # a full queue drops new spans, which bounds the memory held while the collector is unreachable
+    tracer.add_span_processor(
+        KeepSpanProcessor(
+            span_exporter,
+            keep_errors=TRACING_KEEP_ERRORS,
+            slow_threshold_ms=TRACING_SLOW_THRESHOLD_MS,
+            max_queue_size=OTLP_MAX_QUEUE_SIZE,
+            schedule_delay_millis=OTLP_SCHEDULE_DELAY_MS,
+            max_export_batch_size=OTLP_MAX_EXPORT_BATCH_SIZE,
+            export_timeout_millis=OTLP_EXPORT_TIMEOUT_MS,
+        )
+    )
 
-    FastAPIInstrumentor.instrument_app(app, tracer_provider=tracer)
+    return tracer
@@ -0,0 +1,12 @@
+# thirdparty
+from celery import Celery
+
+# project
+import settings
+
+celery_app = Celery(
+    "mini-app-api",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=["tasks.player_import"],
+)
@@ -0,0 +1,48 @@
+# stdlib
+import asyncio
+from typing import Optional
+
+# project
+from db.db_setup import database, redis_connection_pool
+from services.player_import_service import ImportFormat, ImportProgress, import_players
+from tasks import celery_app
+
+
+async def run_import(task, path: str, import_format: ImportFormat, **kwargs) -> ImportProgress:
+    def report(progress: ImportProgress) -> None:
+        task.update_state(state="PROGRESS", meta=progress._asdict())
+
+    # a new event loop per task, so the engines are created on it
+    database.start()
+    try:
+        return await import_players(path, import_format, on_progress=report, **kwargs)
+    finally:
+        await database.dispose()
+        # its connections belong to this event loop
+        await redis_connection_pool.disconnect()
+
+
+@celery_app.task(bind=True, name="players.import")
+def import_players_task(
+    self,
+    path: str,
+    import_format: str = ImportFormat.CSV.value,
+    checkpoint_path: Optional[str] = None,
+    rejects_path: Optional[str] = None,
+    restart: bool = False,
+) -> dict:
+    """
+    ``scripts.import_players`` on a worker; ``path`` must be readable by it. Progress is reported as the
+    ``PROGRESS`` state, and a retried or resubmitted task resumes from the checkpoint.
+    """
+    progress = asyncio.run(
+        run_import(
+            self,
+            path,
+            ImportFormat(import_format),
+            checkpoint_path=checkpoint_path,
+            rejects_path=rejects_path,
+            restart=restart,
+        )
+    )
+    return progress._asdict()
@@ -0,0 +1,24 @@
+# thirdparty
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeAsyncRedisConnection
+
+# project
+from db.db_setup import redis_connection_pool
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def redis_server(monkeypatch):
+    """Points the shared Redis pool at a fresh in-memory server; ``connected = False`` makes every command fail."""
+    server = FakeServer()
+    monkeypatch.setattr(redis_connection_pool, "connection_class", FakeAsyncRedisConnection)
+    monkeypatch.setitem(redis_connection_pool.connection_kwargs, "server", server)
+    yield server
+    # pooled connections are bound to the server and to the event loop of the test
+    await redis_connection_pool.disconnect()
+    redis_connection_pool.reset()
@@ -0,0 +1,120 @@
+# stdlib
+import asyncio
+
+# thirdparty
+import pytest
+
+# project
+from utils.dataloader import BatchWriter, DataLoader
+
+pytestmark = pytest.mark.anyio
+
+
+class BatchFunction:
+    """Records its calls; ``bad`` keys raise ``ValueError``, and ``error`` is raised by every call."""
+
+    def __init__(self, bad=(), error=None) -> None:
+        self.calls = []
+        self.bad = set(bad)
+        self.error = error
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, keys):
+        self.calls.append(sorted(keys))
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        if self.bad & set(keys):
+            raise ValueError(sorted(self.bad & set(keys)))
+        return {key: f"value{key}" for key in keys if key != 0}
+
+
+async def test_loads_within_one_tick_are_coalesced():
+    batch_function = BatchFunction()
+    loader = DataLoader(batch_function)
+
+    values = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(0))
+
+    assert values == ["value1", "value2", "value1", None]
+    assert batch_function.calls == [[0, 1, 2]]
+
+
+async def test_full_batch_is_dispatched_at_once():
+    batch_function = BatchFunction()
+    loader = DataLoader(batch_function, max_batch_size=2)
+
+    assert await loader.load_many([1, 2, 3]) == ["value1", "value2", "value3"]
+    assert batch_function.calls == [[1, 2], [3]]
+
+
+async def test_key_of_running_batch_joins_it():
+    batch_function = BatchFunction()
+    batch_function.release.clear()
+    loader = DataLoader(batch_function)
+
+    first = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert 1 in loader._inflight
+
+    second = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0)
+    batch_function.release.set()
+
+    assert await asyncio.gather(first, second) == ["value1", "value1"]
+    assert batch_function.calls == [[1]]
+    assert not loader._inflight
+    # a key is loaded again once its batch is done
+    assert await loader.load(1) == "value1"
+    assert len(batch_function.calls) == 2
+
+
+async def test_cancelled_caller_does_not_cancel_the_batch():
+    batch_function = BatchFunction()
+    batch_function.release.clear()
+    loader = DataLoader(batch_function)
+
+    cancelled, other = asyncio.ensure_future(loader.load(1)), asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    batch_function.release.set()
+
+    assert await other == "value1"
+
+
+async def test_failing_key_only_fails_its_callers():
+    batch_function = BatchFunction(bad={3})
+    writer = BatchWriter(batch_function, split_on=lambda e: isinstance(e, ValueError))
+
+    results = await asyncio.gather(*(writer.write(key, key) for key in range(1, 9)), return_exceptions=True)
+
+    assert isinstance(results[2], ValueError)
+    assert [result for key, result in enumerate(results, 1) if key != 3] == [
+        f"value{key}" for key in range(1, 9) if key != 3
+    ]
+    # bisected rather than retried key by key
+    assert batch_function.calls == [list(range(1, 9)), [1, 2, 3, 4], [1, 2], [3, 4], [3], [4], [5, 6, 7, 8]]
+
+
+async def test_other_errors_fail_the_whole_batch_at_once():
+    batch_function = BatchFunction(error=ConnectionError("database unavailable"))
+    writer = BatchWriter(batch_function, split_on=lambda e: isinstance(e, ValueError))
+
+    results = await asyncio.gather(*(writer.write(key, key) for key in range(1, 9)), return_exceptions=True)
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert batch_function.calls == [list(range(1, 9))]
+
+
+async def test_batch_writer_keeps_the_first_value_queued_for_a_key():
+    received = []
+
+    async def write(values):
+        received.append(values)
+        return {key: value for key, value in values.items()}
+
+    writer = BatchWriter(write)
+
+    assert await asyncio.gather(writer.write(1, "first"), writer.write(1, "second")) == ["first", "first"]
+    assert received == [{1: "first"}]
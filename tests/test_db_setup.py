@@ -0,0 +1,53 @@
+# stdlib
+from types import SimpleNamespace
+
+# thirdparty
+import anyio
+import pytest
+from starlette.requests import Request
+
+# project
+import settings
+from db import db_setup
+from utils.cache import TTLCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def database(monkeypatch, redis_server):
+    """Primary and replica engines on different hosts; nothing connects to them."""
+    monkeypatch.setattr(db_setup, "DATABASE_URL", "postgresql+asyncpg://primary/db")
+    monkeypatch.setattr(db_setup, "DATABASE_REPLICA_URL", "postgresql+asyncpg://replica/db")
+    monkeypatch.setattr(db_setup, "primary_pins", TTLCache(maxsize=100, ttl=settings.READ_YOUR_WRITES_TTL))
+    db_setup.database.start()
+    yield db_setup.database
+    await db_setup.database.dispose()
+
+
+async def read_session_target(player_id=None):
+    state = {} if player_id is None else {"player": SimpleNamespace(id=player_id)}
+    async for session in db_setup.get_read_session(Request({"type": "http", "state": state})):
+        return session.bind.url.host, session.info["primary"]
+
+
+async def test_reads_go_to_the_replica(database):
+    assert database.has_replica
+    assert await read_session_target(1) == ("replica", False)
+    assert await read_session_target() == ("replica", False)
+
+
+async def test_pinned_player_reads_from_the_primary(database):
+    await db_setup.pin_to_primary(1)
+
+    assert await read_session_target(1) == ("primary", True)
+    assert await read_session_target(2) == ("replica", False)
+    assert 0 < await db_setup.redis_client.ttl("db:pin:1") <= settings.READ_YOUR_WRITES_TTL
+
+
+async def test_pin_of_another_worker_is_honoured_until_it_expires(database):
+    await db_setup.redis_client.set("db:pin:1", 1, px=100)
+
+    assert await read_session_target(1) == ("primary", True)
+    await anyio.sleep(0.2)
+    assert await read_session_target(1) == ("replica", False)
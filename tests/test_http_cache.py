@@ -0,0 +1,117 @@
+# stdlib
+from datetime import datetime
+
+# thirdparty
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+
+# project
+from utils.helpers import response_wrapper_result
+from utils.http_cache import HTTPCache, NotModifiedException, etag_matches, not_modified_exception_handler
+
+UPDATED_AT = datetime(2024, 5, 1, 12, 30, 15, 123456)
+
+app = FastAPI()
+app.add_exception_handler(NotModifiedException, not_modified_exception_handler)
+
+no_cache = HTTPCache("private, no-cache")
+max_age = HTTPCache("private, max-age=10")
+calls = []
+
+
+@app.get("/no-cache/{player_id}", dependencies=[Depends(no_cache)])
+async def read_no_cache(request: Request, player_id: int):
+    calls.append(player_id)
+    return no_cache.respond(request, response_wrapper_result(result={"id": player_id}), last_modified=UPDATED_AT)
+
+
+@app.get("/max-age/{player_id}", dependencies=[Depends(max_age)])
+async def read_max_age(request: Request, player_id: int):
+    calls.append(player_id)
+    return max_age.respond(request, response_wrapper_result(result={"id": player_id}), last_modified=UPDATED_AT)
+
+
+@pytest.fixture
+def client():
+    calls.clear()
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "if_none_match, matches",
+    [
+        ('W/"abc"', True),
+        ('"abc"', True),
+        ('W/"other", W/"abc"', True),
+        ("*", True),
+        ('W/"other"', False),
+        ('W/"ab"', False),
+    ],
+)
+def test_etag_matches_weakly(if_none_match, matches):
+    assert etag_matches(if_none_match, 'W/"abc"') is matches
+
+
+def test_response_carries_validators(client):
+    response = client.get("/no-cache/1")
+
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('W/"')
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert response.headers["Last-Modified"] == "Wed, 01 May 2024 12:30:15 GMT"
+
+
+def test_matching_if_none_match_is_not_modified(client):
+    etag = client.get("/no-cache/1").headers["ETag"]
+
+    response = client.get("/no-cache/1", headers={"If-None-Match": f'W/"other", {etag.removeprefix("W/")}'})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert client.get("/no-cache/2", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_no_cache_always_runs_the_endpoint(client):
+    etag = client.get("/no-cache/1").headers["ETag"]
+
+    assert client.get("/no-cache/1", headers={"If-None-Match": etag}).status_code == 304
+    assert no_cache.validators is None
+    assert calls == [1, 1]
+
+
+def test_remembered_validator_answers_before_the_endpoint(client):
+    etag = client.get("/max-age/1").headers["ETag"]
+
+    response = client.get("/max-age/1", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["Cache-Control"] == "private, max-age=10"
+    assert response.headers["Last-Modified"] == "Wed, 01 May 2024 12:30:15 GMT"
+    assert calls == [1]
+
+    # a stale copy is rebuilt by the endpoint
+    assert client.get("/max-age/1", headers={"If-None-Match": 'W/"stale"'}).status_code == 200
+    assert calls == [1, 1]
+
+
+@pytest.mark.parametrize(
+    "if_modified_since, status_code",
+    [
+        ("Wed, 01 May 2024 12:30:15 GMT", 304),
+        ("Thu, 02 May 2024 00:00:00 GMT", 304),
+        ("Wed, 01 May 2024 12:30:14 GMT", 200),
+        ("not a date", 200),
+    ],
+)
+def test_if_modified_since(client, if_modified_since, status_code):
+    assert client.get("/no-cache/1", headers={"If-Modified-Since": if_modified_since}).status_code == status_code
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since(client):
+    response = client.get(
+        "/no-cache/1", headers={"If-None-Match": 'W/"stale"', "If-Modified-Since": "Thu, 02 May 2024 00:00:00 GMT"}
+    )
+
+    assert response.status_code == 200
@@ -0,0 +1,57 @@
+# stdlib
+import hashlib
+import hmac
+import json
+import time
+from urllib.parse import quote
+
+# project
+from utils.cache import TTLCache
+from utils.init_data import InitDataUser, InitDataVerifier
+
+BOT_TOKEN = "123456:test-token"
+
+
+def sign(user: dict, auth_date: int, bot_token: str = BOT_TOKEN) -> str:
+    vals = {"query_id": "AAHdF6IQAAAAAN0XohDhrOrc", "user": json.dumps(user), "auth_date": str(auth_date)}
+    data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(vals.items()))
+    secret_key = hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+    vals["hash"] = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return "&".join(f"{k}={quote(v, safe='')}" for k, v in vals.items())
+
+
+def test_valid_init_data_is_accepted():
+    auth_date = int(time.time())
+    init_data = sign({"id": 1, "username": "alice", "first_name": "Alice"}, auth_date)
+
+    user = InitDataVerifier(BOT_TOKEN).verify(init_data)
+
+    assert user == InitDataUser(id=1, username="alice", first_name="Alice", auth_date=auth_date)
+
+
+def test_bad_hash_is_rejected():
+    verifier = InitDataVerifier(BOT_TOKEN)
+    init_data = sign({"id": 1}, int(time.time()))
+
+    assert verifier.verify(init_data.replace("query_id=AAH", "query_id=BBH")) is None
+    assert verifier.verify(sign({"id": 1}, int(time.time()), bot_token="654321:other-token")) is None
+    assert verifier.verify(init_data.rpartition("&hash=")[0]) is None
+
+
+def test_expired_auth_date_is_rejected():
+    verifier = InitDataVerifier(BOT_TOKEN, max_age=60)
+
+    assert verifier.verify(sign({"id": 1}, int(time.time()) - 61)) is None
+
+
+def test_cached_init_data_expires_with_auth_date(monkeypatch):
+    verifier = InitDataVerifier(BOT_TOKEN, max_age=60, cache_ttl=300)
+    clock = time.monotonic()
+    verifier.cache = TTLCache(maxsize=100, ttl=300, timer=lambda: clock)
+    now = time.time()
+    init_data = sign({"id": 1}, int(now))
+    assert verifier.verify(init_data) is not None
+
+    clock += 61
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert verifier.verify(init_data) is None
@@ -0,0 +1,27 @@
+# thirdparty
+import pytest
+
+# project
+from db.schemas.leaderboard_schema import ScoreSubmit
+from routers import leaderboard
+from utils.errors import ErrorResponseEnum
+from utils.helpers import CustomHTTPException
+from utils.init_data import InitDataUser
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_score_of_out_of_range_player_id_is_rejected(monkeypatch, redis_server):
+    submitted = []
+
+    async def submit(player_id, score):
+        submitted.append(player_id)
+
+    monkeypatch.setattr(leaderboard.leaderboard_service, "submit", submit)
+    player = InitDataUser(id=2**31, username="alice", first_name="Alice", auth_date=0)
+
+    with pytest.raises(CustomHTTPException) as exc_info:
+        await leaderboard.submit_score(ScoreSubmit(score=10), player)
+
+    assert exc_info.value.error_response is ErrorResponseEnum.PLAYER_ID_OUT_OF_RANGE
+    assert submitted == []
@@ -0,0 +1,50 @@
+# thirdparty
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# project
+from utils.helpers import CustomHTTPException, custom_exception_handler
+from utils.pagination import decode_cursor, encode_cursor
+
+app = FastAPI()
+app.add_exception_handler(CustomHTTPException, custom_exception_handler)
+
+
+@app.get("/cursor")
+async def read_cursor(cursor: str):
+    return list(decode_cursor(cursor, str, int))
+
+
+@pytest.mark.parametrize("values", [(1,), ("alice", 2**31 - 1), ("名前/+=", -5)])
+def test_cursor_round_trip(values):
+    cursor = encode_cursor(*values)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, *map(type, values)) == values
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "garbage!",
+        "not-base64",
+        encode_cursor("alice"),
+        encode_cursor(2, "alice"),
+        encode_cursor("alice", 2.5),
+        encode_cursor("alice", True),
+        encode_cursor("alice", 2, 3),
+    ],
+)
+def test_invalid_cursor_is_unprocessable(cursor):
+    response = TestClient(app).get("/cursor", params={"cursor": cursor})
+
+    assert response.status_code == 422
+    assert response.json()["code"] == "INVALID_QUERY_PARAMETERS"
+
+
+def test_valid_cursor_is_accepted():
+    response = TestClient(app).get("/cursor", params={"cursor": encode_cursor("alice", 2)})
+
+    assert response.status_code == 200
+    assert response.json() == ["alice", 2]
@@ -0,0 +1,119 @@
+# stdlib
+import asyncio
+
+# thirdparty
+import pytest
+from prometheus_client import REGISTRY
+
+# project
+from services.player_activity_service import PlayerActivityTracker
+from utils.init_data import InitDataUser
+
+pytestmark = pytest.mark.anyio
+
+
+def player(player_id: int, auth_date: int = 100) -> InitDataUser:
+    return InitDataUser(id=player_id, username=f"player{player_id}", first_name="", auth_date=auth_date)
+
+
+def writes(result: str) -> float:
+    return REGISTRY.get_sample_value("player_activity_writes_total", {"result": result}) or 0
+
+
+def pending() -> float:
+    return REGISTRY.get_sample_value("player_activity_pending") or 0
+
+
+def create_tracker(monkeypatch, max_pending: int = 10, failing=()):
+    """Tracker writing batches of 2 rows into ``written``; a batch with a ``failing`` id fails."""
+    tracker = PlayerActivityTracker(interval=10, batch_size=2, max_pending=max_pending)
+    tracker.written = []
+
+    async def write(rows):
+        if any(player_id in failing for player_id, _ in rows):
+            raise ConnectionError("database unavailable")
+        tracker.written.append(rows)
+
+    monkeypatch.setattr(tracker, "write", write)
+    return tracker
+
+
+def test_record_keeps_the_newest_session_of_a_player(monkeypatch):
+    tracker = create_tracker(monkeypatch)
+
+    tracker.record(player(1, auth_date=200))
+    tracker.record(player(1, auth_date=100))
+    tracker.record(player(2**31))
+
+    assert list(tracker.pending) == [1]
+    assert tracker.pending[1][1] == 200
+
+
+async def test_flush_writes_sorted_batches(monkeypatch):
+    tracker = create_tracker(monkeypatch)
+    before = pending()
+    for player_id in (3, 1, 2):
+        tracker.record(player(player_id))
+    assert pending() == before + 3
+
+    await tracker.flush()
+
+    assert [[player_id for player_id, _ in rows] for rows in tracker.written] == [[1, 2], [3]]
+    assert tracker.pending == {}
+    assert pending() == before
+
+
+async def test_failed_batch_is_buffered_again(monkeypatch):
+    tracker = create_tracker(monkeypatch, failing={3})
+    errors = writes("error")
+    for player_id in (1, 2, 3, 4):
+        tracker.record(player(player_id, auth_date=100))
+
+    seen_at = tracker.pending[3][0]
+    original_write = tracker.write
+
+    async def write(rows):
+        # a newer session of a player of the failing batch, recorded while it is written
+        tracker.record(player(3, auth_date=300))
+        await original_write(rows)
+
+    monkeypatch.setattr(tracker, "write", write)
+    await tracker.flush()
+
+    assert [[player_id for player_id, _ in rows] for rows in tracker.written] == [[1, 2]]
+    assert sorted(tracker.pending) == [3, 4]
+    assert tracker.pending[3][0] >= seen_at
+    assert tracker.pending[3][1] == 300
+    assert writes("error") == errors + 2
+
+
+async def test_failed_rows_beyond_max_pending_are_dropped(monkeypatch):
+    tracker = create_tracker(monkeypatch, max_pending=2, failing={1, 2, 3})
+    dropped, before = writes("dropped"), pending()
+    for player_id in (1, 2, 3):
+        tracker.record(player(player_id))
+
+    await tracker.flush()
+
+    assert sorted(tracker.pending) == [1, 2]
+    assert writes("dropped") == dropped + 1
+    assert pending() == before + 2
+
+
+async def test_cancelled_flush_buffers_the_rest_again(monkeypatch):
+    tracker = create_tracker(monkeypatch)
+
+    async def write(rows):
+        if rows[0][0] == 3:
+            raise asyncio.CancelledError
+        tracker.written.append(rows)
+
+    monkeypatch.setattr(tracker, "write", write)
+    for player_id in (1, 2, 3, 4, 5):
+        tracker.record(player(player_id))
+
+    with pytest.raises(asyncio.CancelledError):
+        await tracker.flush()
+
+    assert [[player_id for player_id, _ in rows] for rows in tracker.written] == [[1, 2]]
+    assert sorted(tracker.pending) == [3, 4, 5]
@@ -0,0 +1,74 @@
+# thirdparty
+import anyio
+import pytest
+from prometheus_client import REGISTRY
+
+# project
+from db.db_setup import redis_connection_pool
+from services.player_cache_service import PlayerCacheService
+from services.redis_service import RedisService
+
+pytestmark = pytest.mark.anyio
+
+PLAYER = {"id": 1, "username": "alice"}
+
+
+def count(name: str, tier: str) -> float:
+    return REGISTRY.get_sample_value(name, {"tier": tier}) or 0
+
+
+def create_cache() -> PlayerCacheService:
+    return PlayerCacheService(RedisService(redis_connection_pool), local_size=100, local_ttl=30, redis_ttl=300)
+
+
+async def test_read_through_tiers(redis_server):
+    cache, other_worker = create_cache(), create_cache()
+    await cache.set_many([PLAYER])
+
+    hits = count("player_cache_hits_total", "local")
+    assert await cache.get(1) == PLAYER
+    assert count("player_cache_hits_total", "local") == hits + 1
+
+    local_misses, hits = count("player_cache_misses_total", "local"), count("player_cache_hits_total", "redis")
+    assert await other_worker.get(1) == PLAYER
+    assert count("player_cache_misses_total", "local") == local_misses + 1
+    assert count("player_cache_hits_total", "redis") == hits + 1
+    # kept locally once read from Redis
+    assert other_worker.local.get(1) == PLAYER
+
+    misses = count("player_cache_misses_total", "redis")
+    assert await cache.get(2) is None
+    assert count("player_cache_misses_total", "redis") == misses + 1
+
+
+async def test_invalidation_drops_local_copy_of_every_worker(redis_server):
+    cache, other_worker = create_cache(), create_cache()
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(cache.listen)
+        with anyio.fail_after(5):
+            while (await cache.redis.pubsub_numsub(cache.channel))[0][1] == 0:
+                await anyio.sleep(0.01)
+
+        await cache.set_many([PLAYER])
+        await other_worker.invalidate([1])
+
+        with anyio.fail_after(5):
+            while cache.local.get(1) is not None:
+                await anyio.sleep(0.01)
+        tg.cancel_scope.cancel()
+
+    assert await cache.get(1) is None
+
+
+async def test_redis_errors_are_misses(redis_server):
+    cache = create_cache()
+    await cache.set_many([PLAYER])
+    redis_server.connected = False
+
+    await cache.set_many([{"id": 2, "username": "bob"}])
+    await cache.invalidate([3])
+
+    misses = count("player_cache_misses_total", "redis")
+    assert await cache.get_many([1, 2, 4]) == {1: PLAYER, 2: {"id": 2, "username": "bob"}}
+    assert count("player_cache_misses_total", "redis") == misses + 1
@@ -0,0 +1,142 @@
+# stdlib
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+# thirdparty
+import anyio
+import pytest
+
+# project
+from db.db_setup import redis_connection_pool
+from services import player_filter_service, player_service
+from services.player_filter_service import PlayerFilterService
+from services.redis_service import RedisService
+
+pytestmark = pytest.mark.anyio
+
+REPLICA = SimpleNamespace(info={"primary": False})
+PRIMARY = SimpleNamespace(info={"primary": True})
+
+
+class FakeDatabase:
+    """Players table whose queries are recorded."""
+
+    def __init__(self, *player_ids: int) -> None:
+        self.player_ids = set(player_ids)
+        self.queries = []
+
+    async def select_players(self, session, player_ids):
+        self.queries.append(sorted(player_ids))
+        return [{"id": player_id, "username": f"player{player_id}"} for player_id in player_ids if player_id in self]
+
+    def __contains__(self, player_id: int) -> bool:
+        return player_id in self.player_ids
+
+
+@pytest.fixture
+async def player_filter(monkeypatch, redis_server):
+    player_filter = PlayerFilterService(
+        RedisService(redis_connection_pool), enabled=True, bits=2**16, hashes=7, negative_ttl=30, batch_size=100
+    )
+    await player_filter.redis.setbit(player_filter.key, player_filter.bits, 1)
+    monkeypatch.setattr(player_service, "player_filter_service", player_filter)
+    return player_filter
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(player_service, "select_players", database.select_players)
+    monkeypatch.setattr(player_service, "async_read_session", nullcontext)
+    return database
+
+
+async def create(player_filter: PlayerFilterService, database: FakeDatabase, player_id: int) -> None:
+    # what upsert_players does around the insert
+    await player_filter.add([player_id])
+    database.player_ids.add(player_id)
+
+
+async def test_rejected_id_never_reaches_database(player_filter, database):
+    await create(player_filter, database, 1)
+
+    assert await player_service.fetch_players(REPLICA, [1, 2]) == {1: {"id": 1, "username": "player1"}}
+    assert await player_service.fetch_players(PRIMARY, [2]) == {}
+    assert database.queries == [[1]]
+
+
+async def test_added_id_is_found(player_filter, database):
+    assert await player_filter.candidates([3]) == ([], True)
+
+    await create(player_filter, database, 3)
+
+    assert await player_service.fetch_players(REPLICA, [3]) == {3: {"id": 3, "username": "player3"}}
+    assert database.queries == [[3]]
+
+
+async def test_missing_id_is_remembered(player_filter, database):
+    # let through by the filter, but not in the database yet: a lagging replica, or a false positive
+    await player_filter.add([4])
+
+    assert await player_service.fetch_players(REPLICA, [4]) == {}
+    assert await player_service.fetch_players(REPLICA, [4]) == {}
+    assert database.queries == [[4]]
+
+    # the create drops the remembered miss
+    await create(player_filter, database, 4)
+    assert await player_service.fetch_players(REPLICA, [4]) == {4: {"id": 4, "username": "player4"}}
+
+
+async def test_pinned_read_ignores_remembered_misses(player_filter, database):
+    await create(player_filter, database, 5)
+    # remembered by a replica read which started before the insert
+    await player_filter.record_missing([5], checked=True)
+
+    assert await player_service.fetch_players(REPLICA, [5]) == {}
+    assert await player_service.fetch_players(PRIMARY, [5]) == {5: {"id": 5, "username": "player5"}}
+
+
+async def test_every_id_is_let_through_until_the_filter_is_ready(player_filter, redis_server):
+    await player_filter.redis.delete(player_filter.key)
+
+    assert await player_filter.candidates([6, 7]) == ([6, 7], False)
+
+    redis_server.connected = False
+    assert await player_filter.candidates([6, 7]) == ([6, 7], False)
+
+
+async def test_lost_bitmap_is_not_trusted_and_rebuilt(monkeypatch, player_filter, database):
+    rebuilds = []
+
+    async def rebuild():
+        rebuilds.append(await player_filter.redis.exists(player_filter.rebuild_lock_key))
+        await player_filter.add(sorted(database.player_ids))
+        await player_filter.redis.setbit(player_filter.key, player_filter.bits, 1)
+        return len(database.player_ids)
+
+    monkeypatch.setattr(player_filter, "rebuild", rebuild)
+    monkeypatch.setattr(player_filter_service, "REBUILD_CHECK_INTERVAL", 0)
+    await create(player_filter, database, 8)
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(player_filter.run)
+        await anyio.sleep(0.01)
+        # the filter was ready, nothing to rebuild
+        assert rebuilds == []
+
+        # evicted, then recreated with only the bits of a new player
+        await player_filter.redis.delete(player_filter.key)
+        await create(player_filter, database, 9)
+        assert await player_service.fetch_players(REPLICA, [8, 9]) == {
+            8: {"id": 8, "username": "player8"},
+            9: {"id": 9, "username": "player9"},
+        }
+
+        with anyio.fail_after(5):
+            while not rebuilds:
+                await anyio.sleep(0.01)
+        tg.cancel_scope.cancel()
+
+    assert rebuilds == [1]
+    assert not await player_filter.redis.exists(player_filter.rebuild_lock_key)
+    assert await player_filter.candidates([8, 9, 10]) == ([8, 9], True)
@@ -0,0 +1,38 @@
+# thirdparty
+import pytest
+
+# project
+from db.schemas.player_schema import PlayerCreate
+from services import player_service
+from utils.errors import ErrorResponseEnum
+from utils.helpers import CustomHTTPException
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    writes = []
+
+    async def write(key, value):
+        writes.append(key)
+        return {"id": key, "username": value.username}
+
+    monkeypatch.setattr(player_service.player_writer, "write", write)
+    return writes
+
+
+@pytest.mark.parametrize("player_id", [2**31, -(2**31) - 1, 5_000_000_000])
+async def test_out_of_range_id_is_rejected_before_the_write_batch(redis_server, writes, player_id):
+    with pytest.raises(CustomHTTPException) as exc_info:
+        await player_service.create_or_get_player(PlayerCreate(player_id=player_id, username="alice"))
+
+    assert exc_info.value.error_response is ErrorResponseEnum.PLAYER_ID_OUT_OF_RANGE
+    assert writes == []
+
+
+async def test_player_is_written(redis_server, writes):
+    player = await player_service.create_or_get_player(PlayerCreate(player_id=2**31 - 1, username="alice"))
+
+    assert player == {"id": 2**31 - 1, "username": "alice"}
+    assert writes == [2**31 - 1]
@@ -0,0 +1,93 @@
+# stdlib
+from types import SimpleNamespace
+
+# thirdparty
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from prometheus_client import REGISTRY
+from starlette.requests import Request
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+# project
+from services.rate_limit_service import RateLimit
+from utils.errors import ErrorResponseEnum
+from utils.helpers import CustomHTTPException, custom_exception_handler
+
+pytestmark = pytest.mark.anyio
+
+app = FastAPI()
+app.add_exception_handler(CustomHTTPException, custom_exception_handler)
+
+
+@app.get("/limited", dependencies=[Depends(RateLimit("test-ip", "2/minute", ip_factor=1))])
+async def limited():
+    return {}
+
+
+@app.get("/unavailable", dependencies=[Depends(RateLimit("test-unavailable", "1/minute", ip_factor=1))])
+async def unavailable():
+    return {}
+
+
+@app.get("/proxied", dependencies=[Depends(RateLimit("test-proxied", "1/minute", ip_factor=1))])
+async def proxied():
+    return {}
+
+
+def rejections(route: str, tier: str) -> float:
+    return REGISTRY.get_sample_value("rate_limit_rejections_total", {"route": route, "key_type": "ip", "tier": tier})
+
+
+def player_request(player_id: int) -> Request:
+    return Request({"type": "http", "state": {"player": SimpleNamespace(id=player_id)}, "client": ("10.0.0.1", 1)})
+
+
+async def test_exhausted_bucket_is_rejected_with_retry_after(redis_server):
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        assert [(await client.get("/limited")).status_code for _ in range(2)] == [200, 200]
+
+        response = await client.get("/limited")
+        assert response.status_code == 429
+        assert response.json()["code"] == "TOO_MANY_REQUESTS"
+        # a token comes back every 30 seconds
+        assert 0 < int(response.headers["Retry-After"]) <= 30
+        assert rejections("test-ip", "redis") == 1
+
+        # rejected again without asking Redis
+        assert (await client.get("/limited")).status_code == 429
+        assert rejections("test-ip", "local") == 1
+
+
+async def test_clients_behind_a_trusted_proxy_have_their_own_bucket(redis_server):
+    # as the uvicorn workers run the app with FORWARDED_ALLOW_IPS set to the load balancer
+    transport = httpx.ASGITransport(app=ProxyHeadersMiddleware(app, trusted_hosts="10.0.0.2"), client=("10.0.0.2", 1))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def get(forwarded_for):
+            return (await client.get("/proxied", headers={"X-Forwarded-For": forwarded_for})).status_code
+
+        assert [await get("1.1.1.1") for _ in range(2)] == [200, 429]
+        # a client cannot pick its address: the first one not added by a trusted proxy is used
+        assert await get("2.2.2.2, 1.1.1.1") == 429
+        assert await get("3.3.3.3") == 200
+
+
+async def test_player_bucket_is_separate_from_other_players(redis_server):
+    limit = RateLimit("test-player", "1/minute", ip_factor=10)
+    await limit(player_request(1))
+
+    with pytest.raises(CustomHTTPException) as exc_info:
+        await limit(player_request(1))
+    assert exc_info.value.error_response is ErrorResponseEnum.TOO_MANY_REQUESTS
+    assert int(exc_info.value.headers["Retry-After"]) == 60
+
+    await limit(player_request(2))
+
+
+async def test_requests_pass_while_redis_fails(redis_server):
+    redis_server.connected = False
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        assert [(await client.get("/unavailable")).status_code for _ in range(3)] == [200, 200, 200]
@@ -0,0 +1,129 @@
+# stdlib
+import hmac
+import json
+from typing import Optional
+
+# thirdparty
+from fastapi import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# project
+import settings
+from services.player_activity_service import player_activity_tracker
+from utils.errors import ErrorResponseEnum
+from utils.helpers import CustomHTTPException
+from utils.init_data import InitDataUser, init_data_verifier
+
+UNAUTHORIZED_RESPONSE = JSONResponse(status_code=401, content="UNAUTHORIZED")
+
+
+class InitDataAuthMiddleware:
+    """
+    Pure ASGI middleware verifying the ``initData`` field of write request bodies.
+
+    The body is read once and replayed unchanged to the application; the verified player is stored
+    in ``scope["state"]["player"]`` and exposed to endpoints through ``get_current_player``.
+    Every verified request is recorded by ``player_activity_tracker``.
+    Other requests may identify the player with an optional ``Authorization: tma <initData>`` header.
+    """
+
+    def __init__(self, app: ASGIApp, methods: tuple = ("POST", "PUT")) -> None:
+        self.app = app
+        self.methods = frozenset(methods)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] not in self.methods:
+            await self.authenticate_header(scope, receive, send)
+            return
+
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+
+        body = b"".join(chunks)
+
+        player = self.authenticate(body)
+
+        if player is None:
+            await UNAUTHORIZED_RESPONSE(scope, receive, send)
+            return
+
+        scope.setdefault("state", {})["player"] = player
+        player_activity_tracker.record(player)
+
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, replay_receive, send)
+
+    async def authenticate_header(self, scope: Scope, receive: Receive, send: Send) -> None:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, init_data = value.decode("latin-1").partition(" ")
+                if scheme.lower() != "tma":
+                    break
+
+                player = init_data_verifier.verify(init_data)
+
+                if player is None:
+                    await UNAUTHORIZED_RESPONSE(scope, receive, send)
+                    return
+
+                scope.setdefault("state", {})["player"] = player
+                player_activity_tracker.record(player)
+                break
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def authenticate(body: bytes) -> Optional[InitDataUser]:
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return None
+
+        if not isinstance(payload, dict):
+            return None
+
+        init_data = payload.get("initData")
+
+        if not init_data or not isinstance(init_data, str):
+            return None
+
+        return init_data_verifier.verify(init_data)
+
+
+def get_current_player(request: Request) -> InitDataUser:
+    player = request.scope.get("state", {}).get("player")
+
+    if player is None:
+        raise CustomHTTPException(error_response=ErrorResponseEnum.UNAUTHORIZED)
+
+    return player
+
+
+def require_admin(request: Request) -> None:
+    """Admin routes take ``Authorization: Bearer <ADMIN_API_TOKEN>``; every request is refused while it is unset."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if (
+        not settings.ADMIN_API_TOKEN
+        or scheme.lower() != "bearer"
+        or not hmac.compare_digest(token.encode(), settings.ADMIN_API_TOKEN.encode())
+    ):
+        raise CustomHTTPException(error_response=ErrorResponseEnum.FORBIDDEN)
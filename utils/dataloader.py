@@ -0,0 +1,127 @@
+# stdlib
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+
+class DataLoader:
+    """
+    Coalesces concurrent ``load`` calls into batched calls of ``batch_load_fn``.
+
+    Keys requested within one event-loop tick (or within ``delay`` seconds when it is positive) are
+    deduplicated and resolved with a single ``batch_load_fn(keys)`` call, which returns a mapping of
+    key to value. Keys missing from that mapping resolve to ``None``. A key already part of a running
+    batch joins it instead of being requested again. A batch raising an exception ``split_on`` returns true
+    for is split in halves and retried until it only reaches the callers of the key that caused it; any other
+    exception reaches every caller of the batch.
+    """
+
+    def __init__(
+        self,
+        batch_load_fn: Callable[..., Awaitable[Dict[Hashable, Any]]],
+        delay: float = 0,
+        max_batch_size: int = 1000,
+        split_on: Optional[Callable[[Exception], bool]] = None,
+    ) -> None:
+        self.batch_load_fn = batch_load_fn
+        self.delay = delay
+        self.max_batch_size = max_batch_size
+        self.split_on = split_on
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._values: Dict[Hashable, Any] = {}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._handle: Optional[asyncio.Handle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load(self, key: Hashable) -> Any:
+        return await self._enqueue(key, None)
+
+    async def load_many(self, keys: List[Hashable]) -> List[Any]:
+        return await asyncio.gather(*(self.load(key) for key in keys))
+
+    async def _enqueue(self, key: Hashable, value: Any) -> Any:
+        future = self._pending.get(key) or self._inflight.get(key)
+
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            self._values[key] = value
+
+            if len(self._pending) >= self.max_batch_size:
+                self._dispatch()
+            elif self._handle is None:
+                if self.delay > 0:
+                    self._handle = loop.call_later(self.delay, self._dispatch)
+                else:
+                    self._handle = loop.call_soon(self._dispatch)
+
+        # a cancelled caller must not cancel the batch shared with other callers
+        return await asyncio.shield(future)
+
+    async def _call(self, values: Dict[Hashable, Any]) -> Dict[Hashable, Any]:
+        return await self.batch_load_fn(list(values))
+
+    def _dispatch(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        batch, self._pending = self._pending, {}
+        values, self._values = self._values, {}
+
+        if batch:
+            self._inflight.update(batch)
+            task = asyncio.create_task(self._run(batch, values))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[Hashable, asyncio.Future], values: Dict[Hashable, Any]) -> None:
+        try:
+            await self._run_part(batch, values)
+        finally:
+            for key, future in batch.items():
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    async def _run_part(self, batch: Dict[Hashable, asyncio.Future], values: Dict[Hashable, Any]) -> None:
+        try:
+            results = await self._call(values)
+        except Exception as e:
+            # an exception not caused by a key, like a lost connection, would only be waited for again per key
+            if len(batch) == 1 or self.split_on is None or not self.split_on(e):
+                self._resolve(batch, exception=e)
+                return
+        else:
+            self._resolve(batch, results=results)
+            return
+
+        # bisected, so a failing key costs about 2 * log2(len(batch)) calls
+        keys = list(batch)
+        for part in (keys[: len(keys) // 2], keys[len(keys) // 2 :]):
+            await self._run_part({key: batch[key] for key in part}, {key: values[key] for key in part})
+
+    @staticmethod
+    def _resolve(
+        batch: Dict[Hashable, asyncio.Future],
+        results: Optional[Dict[Hashable, Any]] = None,
+        exception: Optional[Exception] = None,
+    ) -> None:
+        for key, future in batch.items():
+            if future.done():
+                continue
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(results.get(key))
+
+
+class BatchWriter(DataLoader):
+    """
+    ``DataLoader`` for writes: ``write(key, value)`` calls are batched into ``batch_load_fn(values)``,
+    where ``values`` maps each key to the first value queued for it.
+    """
+
+    async def write(self, key: Hashable, value: Any) -> Any:
+        return await self._enqueue(key, value)
+
+    async def _call(self, values: Dict[Hashable, Any]) -> Dict[Hashable, Any]:
+        return await self.batch_load_fn(values)
@@ -17,9 +17,14 @@ class StatusCodeEnum(Enum):
 
 class ErrorResponseEnum(Enum):
     UNAUTHORIZED = (StatusCodeEnum.UNAUTHORIZED, "Unauthorized")
+    FORBIDDEN = (StatusCodeEnum.FORBIDDEN, "Forbidden")
     PLAYER_NOT_FOUND = (StatusCodeEnum.NOT_FOUND, "Player not found")
+    PLAYER_NOT_RANKED = (StatusCodeEnum.NOT_FOUND, "Player has no leaderboard score")
+    PLAYER_ID_OUT_OF_RANGE = (StatusCodeEnum.UNPROCESSABLE, "Player id is out of range")
+    USERNAME_TAKEN = (StatusCodeEnum.CONFLICT, "Username is already taken")
     INCORRECT_PARAMETERS = (StatusCodeEnum.UNPROCESSABLE, "Incorrect parameters for request")
     INVALID_QUERY_PARAMETERS = (StatusCodeEnum.UNPROCESSABLE, "Invalid query parameters")
+    TOO_MANY_REQUESTS = (StatusCodeEnum.TOO_MANY_REQUESTS, "Too many requests")
     SOMETHING_WENT_WRONG = (StatusCodeEnum.SERVER_ERROR, "Something went wrong")
 
     def __init__(self, http_code, message):
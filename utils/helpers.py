@@ -1,42 +1,32 @@
 # stdlib
-import hashlib
-import hmac
 import traceback
 from datetime import date, datetime
-from urllib.parse import unquote
+from typing import Dict, Optional
 
 # thirdparty
 from fastapi import Request, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, ValidationError
 
 # project
 import settings
 from settings import logger
 from utils.errors import ErrorResponseEnum
+from utils.serialization import dumps, encode_row, encode_rows
 
 
-def response_wrapper_result(result, status_code=status.HTTP_200_OK):
-    response = {"result": jsonable_encoder(result)}
-    return JSONResponse(content=response, status_code=status_code)
+def response_wrapper_result(result, status_code=status.HTTP_200_OK, schema=None):
+    response = {"result": encode_row(result, schema)}
+    return Response(content=dumps(response), status_code=status_code, media_type="application/json")
 
 
-def response_wrapper_results(results, status_code=status.HTTP_200_OK, pagination=None):
-    response = {"results": jsonable_encoder(results)}
+def response_wrapper_results(results, status_code=status.HTTP_200_OK, pagination=None, schema=None):
+    response = {"results": encode_rows(results, schema)}
     if pagination:
         response["pagination"] = pagination
-    return JSONResponse(content=response, status_code=status_code)
-
-
-def validate_mini_app_data(data: str):  # noqa
-    vals = {k: unquote(v) for k, v in [s.split("=", 1) for s in data.split("&")]}
-    data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(vals.items()) if k != "hash")
-
-    secret_key = hmac.new("WebAppData".encode(), settings.BOT_TOKEN.encode(), hashlib.sha256).digest()
-    h = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256)
-    return h.hexdigest() == vals["hash"], vals
+    return Response(content=dumps(response), status_code=status_code, media_type="application/json")
 
 
 def json_serial(obj):
@@ -48,15 +38,17 @@ def json_serial(obj):
 
 
 class CustomHTTPException(Exception):
-    def __init__(self, error_response: ErrorResponseEnum):
+    def __init__(self, error_response: ErrorResponseEnum, headers: Optional[Dict[str, str]] = None):
         self.error_response = error_response
+        self.headers = headers
 
 
 class PaginationModel(BaseModel):
-    page: int
-    pages: int
+    page: Optional[int] = None
+    pages: Optional[int] = None
     on_page: int
-    results: int
+    results: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 def generate_error_response_content(
@@ -91,15 +83,18 @@ async def custom_exception_handler(request: Request, exc: CustomHTTPException):
     return JSONResponse(
         status_code=exc.error_response.http_code.value,
         content=generate_error_response_content(error_response=exc.error_response),
+        headers=exc.headers,
     )
 
 
 async def general_exception_handler(request: Request, exc: Exception) -> JSONResponse:
-    logger.error(f"Error: {exc}\n{traceback.format_exc()}")
+    # the traceback is formatted by the log thread, and here only when it is sent back
+    logger.error(f"Error: {exc}", exc_info=exc)
 
     return JSONResponse(
         status_code=ErrorResponseEnum.SOMETHING_WENT_WRONG.http_code.value,
         content=generate_error_response_content(
-            error_response=ErrorResponseEnum.SOMETHING_WENT_WRONG, traceback=traceback.format_exc()
+            error_response=ErrorResponseEnum.SOMETHING_WENT_WRONG,
+            traceback=traceback.format_exc() if settings.TRACEBACK_OUTPUT_ENABLED else None,
         ),
     )
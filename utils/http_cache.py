@@ -0,0 +1,108 @@
+# stdlib
+import hashlib
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+# thirdparty
+from fastapi import Request, status
+from fastapi.responses import Response
+
+# project
+import settings
+from utils.cache import TTLCache
+
+_MAX_AGE = re.compile(r"(?:^|,)\s*max-age=(\d+)")
+
+
+class NotModifiedException(Exception):
+    def __init__(self, headers: Dict[str, str]):
+        self.headers = headers
+
+
+async def not_modified_exception_handler(request: Request, exc: NotModifiedException) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=exc.headers)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of ``etag`` with every tag listed in an ``If-None-Match`` header."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def max_age(cache_control: str) -> int:
+    if "no-cache" in cache_control or "no-store" in cache_control:
+        return 0
+    match = _MAX_AGE.search(cache_control)
+    return int(match.group(1)) if match else 0
+
+
+class HTTPCache:
+    """
+    Route dependency adding ``Cache-Control`` and validators to GET responses and answering conditional
+    requests with 304.
+
+    ``respond`` tags the response with a weak ETag hashed from its body, since compression changes the bytes
+    sent. Validators are remembered per URL for the ``max-age`` of ``cache_control``, so a conditional request
+    within that window is answered before the endpoint runs; the client was allowed to reuse its copy that
+    long anyway. Outside of it the body is rebuilt, from the player cache when possible, and compared.
+    """
+
+    def __init__(self, cache_control: str, cache_size: int = settings.HTTP_VALIDATOR_CACHE_SIZE) -> None:
+        self.cache_control = cache_control
+        ttl = max_age(cache_control)
+        self.validators = TTLCache(maxsize=cache_size, ttl=ttl) if ttl > 0 else None
+
+    async def __call__(self, request: Request) -> None:
+        if_none_match = request.headers.get("if-none-match")
+        if not if_none_match or self.validators is None:
+            return
+
+        validator = self.validators.get((request.url.path, request.url.query))
+        if validator is not None and etag_matches(if_none_match, validator[0]):
+            raise NotModifiedException(headers=self._headers(*validator))
+
+    def respond(self, request: Request, response: Response, last_modified: Optional[datetime] = None) -> Response:
+        """Adds the validators to ``response``, or replaces it with a 304 when the client's copy is current."""
+        if response.status_code != status.HTTP_200_OK:
+            return response
+
+        etag = f'W/"{hashlib.blake2b(response.body, digest_size=16).hexdigest()}"'
+        if last_modified is not None:
+            # stored timestamps are naive UTC
+            last_modified = format_datetime(last_modified.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+        if self.validators is not None:
+            self.validators.set((request.url.path, request.url.query), (etag, last_modified))
+
+        headers = self._headers(etag, last_modified)
+        if self._is_current(request, etag, last_modified):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        response.headers.update(headers)
+        return response
+
+    def _headers(self, etag: str, last_modified: Optional[str]) -> Dict[str, str]:
+        headers = {"ETag": etag, "Cache-Control": self.cache_control}
+        if last_modified is not None:
+            headers["Last-Modified"] = last_modified
+        return headers
+
+    @staticmethod
+    def _is_current(request: Request, etag: str, last_modified: Optional[str]) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        # If-Modified-Since is only considered without If-None-Match
+        if if_none_match:
+            return etag_matches(if_none_match, etag)
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if not if_modified_since or last_modified is None:
+            return False
+
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
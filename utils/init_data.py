@@ -0,0 +1,95 @@
+# stdlib
+import hashlib
+import hmac
+import json
+import time
+from typing import NamedTuple, Optional
+from urllib.parse import unquote
+
+# project
+import settings
+from utils.cache import TTLCache
+
+
+class InitDataUser(NamedTuple):
+    id: int
+    username: str
+    first_name: str
+    auth_date: int
+
+
+class InitDataVerifier:
+    """
+    Verifies Telegram Mini App initData.
+
+    The HMAC secret is derived from the bot token once, and verified initData strings are kept in a bounded
+    TTL cache, so repeated calls within a client session skip parsing and HMAC work entirely.
+    A cached entry never outlives the ``auth_date`` freshness window.
+    """
+
+    def __init__(self, bot_token: str, max_age: int = 86400, cache_size: int = 10000, cache_ttl: int = 300) -> None:
+        self.secret_key = hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+        self.max_age = max_age
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+    def verify(self, init_data: str) -> Optional[InitDataUser]:
+        now = time.time()
+
+        user = self.cache.get(init_data)
+        if user is not None:
+            return user
+
+        user = self._verify(init_data, now)
+        if user is None:
+            return None
+
+        ttl = self.cache.ttl
+        if self.max_age > 0:
+            ttl = min(ttl, user.auth_date + self.max_age - now)
+
+        if ttl > 0:
+            self.cache.set(init_data, user, ttl=ttl)
+
+        return user
+
+    def _verify(self, init_data: str, now: float) -> Optional[InitDataUser]:
+        try:
+            vals = {k: unquote(v) for k, v in (s.split("=", 1) for s in init_data.split("&"))}
+        except ValueError:
+            return None
+
+        received_hash = vals.pop("hash", None)
+        if not received_hash:
+            return None
+
+        data_check_string = "\n".join(f"{k}={vals[k]}" for k in sorted(vals))
+        h = hmac.new(self.secret_key, data_check_string.encode(), hashlib.sha256)
+        if not hmac.compare_digest(h.hexdigest(), received_hash):
+            return None
+
+        try:
+            auth_date = int(vals.get("auth_date", 0))
+            user = json.loads(vals.get("user") or "{}")
+        except ValueError:
+            return None
+
+        if self.max_age > 0 and now - auth_date > self.max_age:
+            return None
+
+        if not isinstance(user, dict) or not user.get("id"):
+            return None
+
+        return InitDataUser(
+            id=user["id"],
+            username=user.get("username", ""),
+            first_name=user.get("first_name", ""),
+            auth_date=auth_date,
+        )
+
+
+init_data_verifier = InitDataVerifier(
+    bot_token=settings.BOT_TOKEN,
+    max_age=settings.INIT_DATA_MAX_AGE,
+    cache_size=settings.INIT_DATA_CACHE_SIZE,
+    cache_ttl=settings.INIT_DATA_CACHE_TTL,
+)
@@ -0,0 +1,176 @@
+# stdlib
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# thirdparty
+import orjson
+from opentelemetry import trace
+from prometheus_client import Counter
+
+# project
+import settings
+
+LOG_RECORDS_DROPPED = Counter("log_records_dropped_total", "Total count of log records dropped on a full log queue.")
+
+TEXT_FORMAT = (
+    "%(asctime)s %(levelname)s [%(name)s] [%(filename)s:%(lineno)d] [trace_id=%(trace_id)s span_id=%(span_id)s] "
+    "- %(message)s"
+)
+# root for the application loggers; uvicorn's own, and under gunicorn its handlers, are set up before the app
+LOGGERS = ("", "uvicorn", "uvicorn.error", "uvicorn.access")
+
+
+def access_args(record: logging.LogRecord) -> Optional[Tuple[str, str, str, str, int]]:
+    """(client, method, path, HTTP version, status) of a ``uvicorn.access`` record."""
+    if record.name != "uvicorn.access" or not isinstance(record.args, tuple) or len(record.args) != 5:
+        return None
+    return record.args
+
+
+class AccessLogFilter(logging.Filter):
+    """Drops access records of ``/metrics`` scrapes and of 200 responses; reads the arguments, not the message."""
+
+    def __init__(self, excluded_paths: Sequence[str] = ("/metrics",), excluded_statuses: Sequence[int] = (200,)):
+        super().__init__()
+        self.excluded_paths = tuple(excluded_paths)
+        self.excluded_statuses = frozenset(excluded_statuses)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        args = access_args(record)
+        if args is None:
+            return True
+        _, _, path, _, status = args
+        return status not in self.excluded_statuses and not path.startswith(self.excluded_paths)
+
+
+class JSONFormatter(logging.Formatter):
+    """One compact JSON object per record; access records also carry their request fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        args = access_args(record)
+        if args is not None:
+            entry["client"], entry["method"], entry["path"], _, entry["status"] = args
+
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id is not None:
+            entry["trace_id"] = trace_id
+            entry["span_id"] = record.span_id
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+
+        return orjson.dumps(entry).decode()
+
+
+class LogQueueHandler(QueueHandler):
+    """
+    Puts records on the queue of ``LogPipeline`` together with the handlers they were meant for.
+
+    Unlike ``QueueHandler``, the message is not formatted here but in the listener thread, so arguments
+    are read after the call returns. The ids of the current span are added here, the listener cannot see them.
+    """
+
+    def __init__(self, log_queue: queue.Queue, handlers: List[logging.Handler], trace_ids: bool) -> None:
+        super().__init__(log_queue)
+        self.handlers = handlers
+        self.trace_ids = trace_ids
+
+    def prepare(self, record: logging.LogRecord) -> Tuple[logging.LogRecord, List[logging.Handler]]:
+        if self.trace_ids:
+            span_context = trace.get_current_span().get_span_context()
+            if span_context.is_valid:
+                record.trace_id = trace.format_trace_id(span_context.trace_id)
+                record.span_id = trace.format_span_id(span_context.span_id)
+        return record, self.handlers
+
+    def enqueue(self, item: Tuple[logging.LogRecord, List[logging.Handler]]) -> None:
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class LogListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # waits for room instead of failing on a full queue
+        self.queue.put(self._sentinel)
+
+    def handle(self, item: Tuple[logging.LogRecord, List[logging.Handler]]) -> None:
+        record, handlers = item
+        for handler in handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class LogPipeline:
+    """
+    Moves the handlers of ``LOGGERS`` to one background thread, so the event loop never formats or writes a
+    record: the loggers only get a ``LogQueueHandler``. Started by the lifespan, after the fork, and stopped
+    once the queue is drained, which restores the handlers.
+
+    With ``LOG_JSON`` every handler writes ``JSONFormatter`` lines; the root logger gets a stderr handler
+    when it has none.
+    """
+
+    def __init__(self) -> None:
+        self.listener: Optional[LogListener] = None
+        self.handlers: Dict[str, List[logging.Handler]] = {}
+
+    def start(self) -> None:
+        if self.listener is not None:
+            return
+
+        root = logging.getLogger()
+        root.setLevel(settings.LOG_LEVEL)
+        if not root.handlers:
+            handler = logging.StreamHandler(sys.stderr)
+            handler.setFormatter(logging.Formatter(TEXT_FORMAT, defaults={"trace_id": "0", "span_id": "0"}))
+            root.addHandler(handler)
+
+        formatter = None
+        if settings.LOG_JSON:
+            formatter = JSONFormatter()
+            # record fields JSONFormatter does not write, per "Optimization" in the logging HOWTO
+            logging.logThreads = logging.logProcesses = logging.logMultiprocessing = False
+            logging._srcfile = None
+        trace_ids = settings.TRACING_ENABLED and settings.TRACING_LOG_CORRELATION
+        log_queue = queue.Queue(settings.LOG_QUEUE_SIZE)
+
+        for name in LOGGERS:
+            logger = logging.getLogger(name)
+            if not logger.handlers:
+                continue
+            self.handlers[name] = logger.handlers
+            if formatter is not None:
+                for handler in logger.handlers:
+                    handler.setFormatter(formatter)
+            logger.handlers = [LogQueueHandler(log_queue, self.handlers[name], trace_ids)]
+
+        self.listener = LogListener(log_queue)
+        self.listener.start()
+
+    def stop(self) -> None:
+        if self.listener is None:
+            return
+
+        self.listener.stop()
+        self.listener = None
+        for name, handlers in self.handlers.items():
+            logging.getLogger(name).handlers = handlers
+        self.handlers = {}
+
+
+log_pipeline = LogPipeline()
@@ -1,28 +1,73 @@
 # stdlib
+import base64
+import json
 from math import ceil
-from typing import Any
+from typing import Any, Optional
+
+# project
+from utils.errors import ErrorResponseEnum
+from utils.helpers import CustomHTTPException
 
 
 class Pagination:
-    def __init__(self, page: int, pages: int, on_page: int, results: int) -> None:
+    def __init__(
+        self,
+        page: Optional[int],
+        pages: Optional[int],
+        on_page: int,
+        results: Optional[int],
+        next_cursor: Optional[str] = None,
+    ) -> None:
         self.page = page
         self.pages = pages
         self.on_page = on_page
         self.results = results
+        self.next_cursor = next_cursor
 
 
 # TODO: fixme
-def get_pagination(page: int, limit: int, count: int) -> dict[str, Any]:
-    try:
-        pages = ceil(count / limit)
-    except Exception:
-        pages = 0
-        count = 0
+def get_pagination(
+    page: Optional[int], limit: int, count: Optional[int], next_cursor: Optional[str] = None
+) -> dict[str, Any]:
+    """
+    Builds the pagination block for both styles: ``page`` is ``None`` for cursor pages,
+    and ``pages``/``results`` are ``None`` when the total count was not requested.
+    """
+    if count is None:
+        pages = None
+    else:
+        try:
+            pages = ceil(count / limit)
+        except Exception:
+            pages = 0
+            count = 0
 
     pagination = Pagination(
         page=page,
         pages=pages,
         on_page=limit,
         results=count,
+        next_cursor=next_cursor,
     )
     return pagination.__dict__
+
+
+def encode_cursor(*values: Any) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    """Decodes a cursor produced by ``encode_cursor`` whose values must be of ``types``."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise CustomHTTPException(error_response=ErrorResponseEnum.INVALID_QUERY_PARAMETERS)
+
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types)
+        or not all(type(value) is type_ for value, type_ in zip(values, types))
+    ):
+        raise CustomHTTPException(error_response=ErrorResponseEnum.INVALID_QUERY_PARAMETERS)
+
+    return tuple(values)
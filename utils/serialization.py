@@ -0,0 +1,56 @@
+# stdlib
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+# thirdparty
+import orjson
+from pydantic import BaseModel
+from sqlalchemy.engine import RowMapping
+
+_row_getters: Dict[Type[BaseModel], Tuple[Tuple[str, ...], Callable[[Any], tuple]]] = {}
+
+
+def _get_row_getter(schema: Type[BaseModel]) -> Tuple[Tuple[str, ...], Callable[[Any], tuple]]:
+    row_getter = _row_getters.get(schema)
+    if row_getter is None:
+        fields = tuple(schema.model_fields)
+        getter = attrgetter(*fields)
+        if len(fields) == 1:
+            getter = lambda row, _getter=getter: (_getter(row),)  # noqa: E731
+        row_getter = _row_getters[schema] = (fields, getter)
+    return row_getter
+
+
+def encode_row(row: Any, schema: Optional[Type[BaseModel]] = None) -> Any:
+    """
+    Converts a row into something orjson encodes natively.
+
+    Dicts pass through untouched; ORM objects are read through an ``attrgetter`` compiled once per schema,
+    which skips pydantic validation and ``jsonable_encoder`` entirely.
+    """
+    if isinstance(row, dict):
+        return row
+    if isinstance(row, RowMapping):
+        return dict(row)
+    if isinstance(row, BaseModel):
+        return row.model_dump()
+    if schema is not None:
+        fields, getter = _get_row_getter(schema)
+        return dict(zip(fields, getter(row)))
+    return row
+
+
+def encode_rows(rows: Iterable[Any], schema: Optional[Type[BaseModel]] = None) -> List[Any]:
+    return [encode_row(row, schema) for row in rows]
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, RowMapping):
+        return dict(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default)
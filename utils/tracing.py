@@ -0,0 +1,100 @@
+# stdlib
+from typing import Optional, Sequence
+
+# thirdparty
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter
+from opentelemetry.sdk.trace.sampling import Decision, ParentBased, Sampler, SamplingResult, TraceIdRatioBased
+from opentelemetry.trace import Link, SpanContext, SpanKind, StatusCode, TraceFlags
+from opentelemetry.trace.span import TraceState
+from opentelemetry.util.types import Attributes
+
+
+class RecordingRatioSampler(Sampler):
+    """
+    ``TraceIdRatioBased`` that still records the first span of the traces it rejects, without sampling them,
+    so ``KeepSpanProcessor`` can export that span after all when it fails or is slow.
+    """
+
+    def __init__(self, ratio: float) -> None:
+        self.ratio = TraceIdRatioBased(ratio)
+
+    def should_sample(
+        self,
+        parent_context: Optional[Context],
+        trace_id: int,
+        name: str,
+        kind: SpanKind = None,
+        attributes: Attributes = None,
+        links: Sequence[Link] = None,
+        trace_state: TraceState = None,
+    ) -> SamplingResult:
+        result = self.ratio.should_sample(parent_context, trace_id, name, kind, attributes, links, trace_state)
+        if result.decision is Decision.DROP:
+            return SamplingResult(Decision.RECORD_ONLY, attributes, result.trace_state)
+        return result
+
+    def get_description(self) -> str:
+        return f"RecordingRatioSampler{{{self.ratio.rate}}}"
+
+
+def build_sampler(ratio: float, keep_errors: bool, slow_threshold_ms: float) -> Sampler:
+    """
+    Samples ``ratio`` of the new traces and follows the decision of the parent span otherwise.
+
+    Spans of unsampled traces are not recorded, except their first span when errors or slow spans are kept:
+    a request left out of the sample costs one recorded span instead of one per statement.
+    """
+    if ratio < 1 and (keep_errors or slow_threshold_ms > 0):
+        return ParentBased(RecordingRatioSampler(ratio))
+    return ParentBased(TraceIdRatioBased(ratio))
+
+
+class KeepSpanProcessor(BatchSpanProcessor):
+    """
+    ``BatchSpanProcessor`` that also exports recorded but unsampled spans that ended with an error status, or
+    that lasted at least ``slow_threshold_ms`` (0 disables it).
+    """
+
+    def __init__(self, span_exporter: SpanExporter, keep_errors: bool, slow_threshold_ms: float, **kwargs) -> None:
+        super().__init__(span_exporter, **kwargs)
+        self.keep_errors = keep_errors
+        self.slow_threshold_ns = slow_threshold_ms * 1_000_000 if slow_threshold_ms > 0 else None
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if not span.context.trace_flags.sampled:
+            if not self._keep(span):
+                return
+            span = self._sampled(span)
+        super().on_end(span)
+
+    def _keep(self, span: ReadableSpan) -> bool:
+        if self.keep_errors and span.status.status_code is StatusCode.ERROR:
+            return True
+        return self.slow_threshold_ns is not None and span.end_time - span.start_time >= self.slow_threshold_ns
+
+    @staticmethod
+    def _sampled(span: ReadableSpan) -> ReadableSpan:
+        # the batch processor drops spans without the sampled flag
+        context = span.context
+        return ReadableSpan(
+            name=span.name,
+            context=SpanContext(
+                context.trace_id,
+                context.span_id,
+                context.is_remote,
+                TraceFlags(TraceFlags.SAMPLED),
+                context.trace_state,
+            ),
+            parent=span.parent,
+            resource=span.resource,
+            attributes=span.attributes,
+            events=span.events,
+            links=span.links,
+            kind=span.kind,
+            status=span.status,
+            start_time=span.start_time,
+            end_time=span.end_time,
+            instrumentation_scope=span.instrumentation_scope,
+        )